@@ -0,0 +1,72 @@
+"""Contact lookups for a burst of jobs: one request per user vs coalesced batches.
+
+Run from the repository root: ``python benchmarks/auth_lookups.py``.
+Pass ``--url http://127.0.0.1:8081`` to hit a running ``stub_auth_server.py``
+(or a real auth service) instead of the in-process stub.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent))
+
+import httpx  # noqa: E402
+from stub_auth_server import create_app  # noqa: E402
+
+from notifications.common.config import Settings  # noqa: E402
+from notifications.worker.auth import AuthClient  # noqa: E402
+
+USERS = 2_000
+CONCURRENCY = 200
+LATENCY_SECONDS = 0.02
+
+
+async def _bench(name: str, url: str | None, baseline: float | None, **overrides):
+    app = create_app(LATENCY_SECONDS)
+    transport = None if url else httpx.ASGITransport(app=app)
+    settings = Settings(
+        auth_base_url=url or "http://auth", contact_cache_size=0, **overrides
+    )
+    user_ids = [uuid4() for _ in range(USERS)]
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async with httpx.AsyncClient(transport=transport) as http:
+        client = AuthClient(settings, http)
+
+        async def lookup(user_id):
+            async with semaphore:
+                await client.get_user_contacts(user_id)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(lookup(user_id) for user_id in user_ids))
+        elapsed = time.perf_counter() - started
+
+    speedup = f"  x{baseline / elapsed:.2f}" if baseline else ""
+    requests = "" if url else f"  {app.state.requests:5d} requests"
+    print(f"  {name:<32} {USERS / elapsed:9.0f} lookups/s{requests}{speedup}")
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    print(f"{USERS} users, {CONCURRENCY} concurrent jobs")
+    before = await _bench("one GET per user (before)", args.url, None)
+    await _bench(
+        "batched, 5ms window (after)",
+        args.url,
+        before,
+        auth_batch_enabled=True,
+        auth_batch_window_ms=5,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
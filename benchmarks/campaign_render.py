@@ -0,0 +1,77 @@
+"""Rendering cost of one campaign email template across many recipients.
+
+Run from the repository root: ``python benchmarks/campaign_render.py``.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from jinja2 import Environment, select_autoescape  # noqa: E402
+
+from notifications.worker.core.template_renderer import (  # noqa: E402
+    render_html_template,
+    render_html_template_batch,
+)
+
+RECIPIENTS = 5_000
+
+TEMPLATE = """
+{% block header %}
+<h1>{{ campaign.title }}</h1>
+{% for film in campaign.films %}<div class="film"><b>{{ film.title }}</b>
+<p>{{ film.description | truncate(120) }}</p></div>{% endfor %}
+{% endblock %}
+<p>Hello, {{ name }}! We picked these for you.</p>
+{% block footer %}<small>{{ campaign.unsubscribe_text }}</small>{% endblock %}
+"""
+
+
+def _contexts() -> list[dict]:
+    campaign = {
+        "title": "New this week",
+        "films": [
+            {"title": f"Film {i}", "description": "A long description. " * 20}
+            for i in range(20)
+        ],
+        "unsubscribe_text": "You can unsubscribe at any time.",
+    }
+    return [{"campaign": campaign, "name": f"User {i}"} for i in range(RECIPIENTS)]
+
+
+def _bench(name: str, fn, baseline: float | None = None) -> float:
+    started = time.process_time()
+    fn()
+    per_message_us = (time.process_time() - started) / RECIPIENTS * 1e6
+    speedup = f"  x{baseline / per_message_us:.2f}" if baseline else ""
+    print(f"  {name:<44} {per_message_us:8.2f} us/msg{speedup}")
+    return per_message_us
+
+
+def main() -> None:
+    contexts = _contexts()
+    uncached = Environment(
+        autoescape=select_autoescape(default_for_string=True, default=True)
+    )
+
+    print(f"{RECIPIENTS} recipients")
+    before = _bench(
+        "from_string + render per job (before)",
+        lambda: [uncached.from_string(TEMPLATE).render(**c) for c in contexts],
+    )
+    _bench(
+        "render_html_template (LRU)",
+        lambda: [render_html_template(TEMPLATE, c) for c in contexts],
+        before,
+    )
+    _bench(
+        "render_html_template_batch (after)",
+        lambda: render_html_template_batch(TEMPLATE, contexts),
+        before,
+    )
+
+
+if __name__ == "__main__":
+    main()
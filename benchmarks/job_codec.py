@@ -0,0 +1,82 @@
+"""Per-message CPU cost of decoding and encoding NotificationJob payloads.
+
+Run from the repository root: ``python benchmarks/job_codec.py``.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from notifications.common.codec import decode_job, encode_json, orjson  # noqa: E402
+from notifications.common.schemas import (  # noqa: E402
+    NotificationChannel,
+    NotificationJob,
+    NotificationMeta,
+)
+
+ITERATIONS = 50_000
+
+
+def _make_job() -> NotificationJob:
+    return NotificationJob(
+        job_id=uuid4(),
+        user_id=uuid4(),
+        channel=NotificationChannel.EMAIL,
+        template_code="welcome_email",
+        locale="en",
+        data={
+            "registration_channel": "web",
+            "user_agent": "Mozilla/5.0 (X11; Linux x86_64)",
+            "films": [{"id": str(uuid4()), "title": f"Film {i}"} for i in range(5)],
+        },
+        meta=NotificationMeta(event_type="user_registered", event_id=uuid4()),
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _bench(name: str, fn, baseline: float | None = None) -> float:
+    for _ in range(1_000):
+        fn()
+    started = time.process_time()
+    for _ in range(ITERATIONS):
+        fn()
+    per_message_us = (time.process_time() - started) / ITERATIONS * 1e6
+    speedup = f"  x{baseline / per_message_us:.2f}" if baseline else ""
+    print(f"  {name:<44} {per_message_us:8.2f} us/msg{speedup}")
+    return per_message_us
+
+
+def main() -> None:
+    job = _make_job()
+    as_dict = job.model_dump(mode="json")
+    raw = json.dumps(as_dict).encode("utf-8")
+
+    print(f"decode ({len(raw)} bytes per message)")
+    before = _bench(
+        "json.loads + model_validate (before)",
+        lambda: NotificationJob.model_validate(json.loads(raw.decode("utf-8"))),
+    )
+    _bench(
+        "model_validate_json",
+        lambda: NotificationJob.model_validate_json(raw),
+        before,
+    )
+    backend = "orjson" if orjson is not None else "model_validate_json"
+    _bench(f"decode_job [{backend}] (after)", lambda: decode_job(raw), before)
+
+    print("encode")
+    before = _bench(
+        "model_dump + json.dumps(default=str) (before)",
+        lambda: json.dumps(job.model_dump(mode="json"), default=str).encode("utf-8"),
+    )
+    _bench("encode_json(job) (after)", lambda: encode_json(job), before)
+    _bench("encode_json(dict)", lambda: encode_json(as_dict), before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Stub of the auth service user endpoints with a fixed per-request latency.
+
+Run from the repository root:
+``python benchmarks/stub_auth_server.py --port 8081 --latency-ms 20``.
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+import uvicorn
+from fastapi import FastAPI, Response
+from pydantic import BaseModel
+
+
+class BatchRequest(BaseModel):
+    user_ids: list[UUID]
+
+
+def _user(user_id: UUID) -> dict:
+    return {
+        "id": str(user_id),
+        "email": f"user-{user_id}@example.com",
+        "push_token": f"push-{user_id}",
+        "ws_session_id": None,
+    }
+
+
+def create_app(latency_seconds: float = 0.02, bulk: bool = True) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/api/v1/users/{user_id}")
+    async def get_user(user_id: UUID) -> dict:
+        app.state.requests += 1
+        await asyncio.sleep(latency_seconds)
+        return _user(user_id)
+
+    @app.post("/api/v1/users:batch", response_model=None)
+    async def get_users(body: BatchRequest) -> Response | dict:
+        app.state.requests += 1
+        if not bulk:
+            return Response(status_code=404)
+        await asyncio.sleep(latency_seconds)
+        return {"users": [_user(user_id) for user_id in body.user_ids]}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--no-bulk", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms / 1000, bulk=not args.no_bulk)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
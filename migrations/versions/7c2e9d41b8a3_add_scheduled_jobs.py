@@ -0,0 +1,46 @@
+"""add scheduled_jobs
+
+Revision ID: 7c2e9d41b8a3
+Revises: f341467cb35c
+Create Date: 2026-10-18 09:05:12.418203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e9d41b8a3"
+down_revision: Union[str, None] = "f341467cb35c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("job_id", sa.UUID(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_index(
+        "ix_scheduled_jobs_due_at",
+        "scheduled_jobs",
+        ["due_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduled_jobs_due_at", table_name="scheduled_jobs")
+    op.drop_table("scheduled_jobs")
@@ -0,0 +1,167 @@
+"""partition notification_delivery by created_at
+
+Revision ID: b5d0e8a1c4f7
+Revises: 7c2e9d41b8a3
+Create Date: 2026-10-18 14:20:31.552107
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d0e8a1c4f7"
+down_revision: Union[str, None] = "7c2e9d41b8a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "job_id, user_id, channel, status, attempts, error_code, error_message, "
+    "sent_at, created_at, updated_at"
+)
+
+# Monthly partitions, named and bounded the same way the worker's
+# DeliveryPartitionManager creates them (notification_delivery_pYYYYMM, UTC).
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month timestamp := date_trunc(
+        'month',
+        COALESCE(
+            (SELECT min(created_at) FROM notification_delivery_legacy), now()
+        ) AT TIME ZONE 'UTC'
+    );
+    last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+        + interval '2 months';
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF notification_delivery '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'notification_delivery_p' || to_char(month, 'YYYYMM'),
+            month::text || '+00',
+            (month + interval '1 month')::text || '+00'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE notification_delivery RENAME TO notification_delivery_legacy"
+    )
+    op.execute(
+        "ALTER TABLE notification_delivery_legacy "
+        "RENAME CONSTRAINT notification_delivery_pkey "
+        "TO notification_delivery_legacy_pkey"
+    )
+    op.execute(
+        "ALTER TABLE notification_delivery_legacy "
+        "DROP CONSTRAINT uq_notification_delivery_job_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_notification_delivery_user_id "
+        "RENAME TO ix_notification_delivery_legacy_user_id"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE notification_delivery (
+            job_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            channel VARCHAR(20) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER DEFAULT 0 NOT NULL,
+            error_code VARCHAR(100),
+            error_message TEXT,
+            sent_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (job_id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_notification_delivery_user_id "
+        "ON notification_delivery (user_id)"
+    )
+    # Catches rows outside every monthly range (e.g. very old jobs replayed
+    # after their month was dropped) instead of failing the insert.
+    op.execute(
+        "CREATE TABLE notification_delivery_default "
+        "PARTITION OF notification_delivery DEFAULT"
+    )
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+
+    # The partitioned primary key can't enforce a unique job_id, and the
+    # worker looks rows up by the job's own timestamp, which legacy rows were
+    # never keyed by. This table keeps job_id unique and maps every job to
+    # the created_at its row is stored under.
+    op.execute(
+        """
+        CREATE TABLE notification_delivery_keys (
+            job_id UUID NOT NULL PRIMARY KEY,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """
+    )
+
+    op.execute(
+        f"INSERT INTO notification_delivery ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM notification_delivery_legacy"
+    )
+    op.execute(
+        "INSERT INTO notification_delivery_keys (job_id, created_at) "
+        "SELECT job_id, created_at FROM notification_delivery_legacy"
+    )
+    op.execute("DROP TABLE notification_delivery_legacy")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE notification_delivery_keys")
+    op.execute(
+        "ALTER TABLE notification_delivery RENAME TO notification_delivery_partitioned"
+    )
+    op.execute(
+        "ALTER TABLE notification_delivery_partitioned "
+        "RENAME CONSTRAINT notification_delivery_pkey "
+        "TO notification_delivery_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_notification_delivery_user_id "
+        "RENAME TO ix_notification_delivery_partitioned_user_id"
+    )
+    op.execute(
+        """
+        CREATE TABLE notification_delivery (
+            job_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            channel VARCHAR(20) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            attempts INTEGER DEFAULT 0 NOT NULL,
+            error_code VARCHAR(100),
+            error_message TEXT,
+            sent_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            CONSTRAINT notification_delivery_pkey PRIMARY KEY (job_id),
+            CONSTRAINT uq_notification_delivery_job_id UNIQUE (job_id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_notification_delivery_user_id "
+        "ON notification_delivery (user_id)"
+    )
+    op.execute(
+        f"INSERT INTO notification_delivery ({COLUMNS}) "
+        f"SELECT DISTINCT ON (job_id) {COLUMNS} "
+        "FROM notification_delivery_partitioned "
+        "ORDER BY job_id, updated_at DESC"
+    )
+    op.execute("DROP TABLE notification_delivery_partitioned CASCADE")
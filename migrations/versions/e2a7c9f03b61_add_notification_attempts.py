@@ -0,0 +1,138 @@
+"""add notification_attempts, slim notification_delivery
+
+Revision ID: e2a7c9f03b61
+Revises: b5d0e8a1c4f7
+Create Date: 2026-10-18 16:02:47.103958
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7c9f03b61"
+down_revision: Union[str, None] = "b5d0e8a1c4f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same monthly layout as notification_delivery, keyed by the job's creation
+# time so both tables share partition boundaries and retention.
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month timestamp := date_trunc(
+        'month',
+        COALESCE(
+            (SELECT min(created_at) FROM notification_delivery), now()
+        ) AT TIME ZONE 'UTC'
+    );
+    last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+        + interval '2 months';
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF notification_attempts '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'notification_attempts_p' || to_char(month, 'YYYYMM'),
+            month::text || '+00',
+            (month + interval '1 month')::text || '+00'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END
+$$;
+"""
+
+SET_DELIVERY_FILLFACTOR = """
+DO $$
+DECLARE
+    part regclass;
+BEGIN
+    FOR part IN
+        SELECT inhrelid::regclass
+        FROM pg_inherits
+        WHERE inhparent = 'notification_delivery'::regclass
+    LOOP
+        EXECUTE format('ALTER TABLE %s SET (fillfactor = {fillfactor})', part);
+    END LOOP;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE notification_attempts_id_seq")
+    op.execute(
+        """
+        CREATE TABLE notification_attempts (
+            id BIGINT DEFAULT nextval('notification_attempts_id_seq') NOT NULL,
+            job_id UUID NOT NULL,
+            job_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            attempt INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            error_code VARCHAR(100),
+            error_message TEXT,
+            recorded_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (id, job_created_at)
+        ) PARTITION BY RANGE (job_created_at)
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE notification_attempts_id_seq OWNED BY notification_attempts.id"
+    )
+    op.execute(
+        "CREATE INDEX ix_notification_attempts_job_id "
+        "ON notification_attempts (job_id, job_created_at)"
+    )
+    op.execute(
+        "CREATE TABLE notification_attempts_default "
+        "PARTITION OF notification_attempts DEFAULT"
+    )
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+
+    # The last known attempt of every job becomes the start of its timeline.
+    op.execute(
+        """
+        INSERT INTO notification_attempts (
+            job_id, job_created_at, attempt, status,
+            error_code, error_message, recorded_at
+        )
+        SELECT
+            job_id, created_at, attempts, status,
+            error_code, error_message, updated_at
+        FROM notification_delivery
+        WHERE status <> 'PROCESSING'
+        """
+    )
+
+    op.execute(
+        "ALTER TABLE notification_delivery "
+        "DROP COLUMN error_code, DROP COLUMN error_message"
+    )
+    op.execute(SET_DELIVERY_FILLFACTOR.replace("{fillfactor}", "80"))
+
+
+def downgrade() -> None:
+    op.execute(SET_DELIVERY_FILLFACTOR.replace("{fillfactor}", "100"))
+    op.execute(
+        "ALTER TABLE notification_delivery "
+        "ADD COLUMN error_code VARCHAR(100), ADD COLUMN error_message TEXT"
+    )
+    # job_id is unique (notification_delivery_keys), while job_created_at is
+    # the job's own timestamp and may differ from the created_at of rows
+    # migrated from before partitioning, so match on job_id alone.
+    op.execute(
+        """
+        UPDATE notification_delivery d
+        SET error_code = a.error_code, error_message = a.error_message
+        FROM (
+            SELECT DISTINCT ON (job_id) job_id, error_code, error_message
+            FROM notification_attempts
+            ORDER BY job_id, recorded_at DESC, id DESC
+        ) a
+        WHERE d.job_id = a.job_id
+        """
+    )
+    op.execute("DROP TABLE notification_attempts CASCADE")
@@ -6,8 +6,44 @@ from uuid import UUID
 
 import asyncpg
 
+from notifications.common.pg import statements
 from notifications.db.models import CampaignStatus
 
+_GET_ACTIVE_CAMPAIGNS = statements.register(
+    "campaigns.get_active",
+    """
+    SELECT
+        id,
+        template_code,
+        segment_id,
+        status,
+        schedule_cron,
+        last_triggered_at,
+        runs_count,
+        max_runs
+    FROM campaigns
+    WHERE status = $1
+    ORDER BY created_at ASC;
+    """,
+)
+
+_MARK_CAMPAIGN_TRIGGERED = statements.register(
+    "campaigns.mark_triggered",
+    """
+    UPDATE campaigns
+    SET
+        last_triggered_at = NOW(),
+        runs_count = runs_count + 1,
+        updated_at = NOW(),
+        status = CASE
+            WHEN max_runs IS NOT NULL AND runs_count + 1 >= max_runs
+                THEN 'INACTIVE'
+            ELSE 'ACTIVE'
+        END
+    WHERE id = $1;
+    """,
+)
+
 
 @dataclass
 class Campaign:
@@ -26,23 +62,10 @@ class CampaignRepository:
         self._pool = pool
 
     async def get_active_campaigns(self) -> list[Campaign]:
-        query = """
-            SELECT
-                id,
-                template_code,
-                segment_id,
-                status,
-                schedule_cron,
-                last_triggered_at,
-                runs_count,
-                max_runs
-            FROM campaigns
-            WHERE status = $1
-            ORDER BY created_at ASC;
-        """
-
         async with self._pool.acquire() as conn:
-            rows = await conn.fetch(query, CampaignStatus.ACTIVE.value)
+            rows = await statements.fetch(
+                conn, _GET_ACTIVE_CAMPAIGNS, CampaignStatus.ACTIVE.value
+            )
 
         return [
             Campaign(
@@ -59,18 +82,5 @@ class CampaignRepository:
         ]
 
     async def mark_campaign_triggered(self, campaign_id: UUID) -> None:
-        query = """
-            UPDATE campaigns
-            SET
-                last_triggered_at = NOW(),
-                runs_count = runs_count + 1,
-                updated_at = NOW(),
-                status = CASE
-                    WHEN max_runs IS NOT NULL AND runs_count + 1 >= max_runs
-                        THEN 'INACTIVE'
-                    ELSE 'ACTIVE'
-                END
-            WHERE id = $1;
-        """
         async with self._pool.acquire() as conn:
-            await conn.execute(query, campaign_id)
+            await statements.execute(conn, _MARK_CAMPAIGN_TRIGGERED, campaign_id)
@@ -5,17 +5,14 @@ import httpx
 import logging
 
 from notifications.common.config import settings
+from notifications.common.pg import create_pool
 
 logger = logging.getLogger(__name__)
 
 
 async def create_db_pool() -> asyncpg.Pool:
     logger.info("Creating Postgres pool for scheduler: dsn=%s", settings.db_asyncpg_dsn)
-    pool = await asyncpg.create_pool(
-        dsn=settings.db_asyncpg_dsn,
-        min_size=1,
-        max_size=5,
-    )
+    pool = await create_pool(settings)
     logger.info("Postgres pool for scheduler created")
     return pool
 
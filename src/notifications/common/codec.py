@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from notifications.common.exceptions import InvalidJobPayloadError
+from notifications.common.schemas import NotificationJob
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def decode_job(raw_value: bytes) -> NotificationJob:
+    try:
+        if orjson is not None:
+            return NotificationJob.model_validate(orjson.loads(raw_value))
+        return NotificationJob.model_validate_json(raw_value)
+    except ValidationError as exc:
+        invalid_json = any(err["type"] == "json_invalid" for err in exc.errors())
+        raise InvalidJobPayloadError(str(exc), invalid_json=invalid_json) from exc
+    except ValueError as exc:
+        raise InvalidJobPayloadError(str(exc), invalid_json=True) from exc
+
+
+def encode_json(value: Any) -> bytes:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, default=str).encode("utf-8")
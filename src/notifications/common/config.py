@@ -1,7 +1,9 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from notifications.common.schemas.notification_enums import NotificationPriority
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -17,8 +19,33 @@ class Settings(BaseSettings):
     kafka_bootstrap_servers: str = "kafka:29092"
 
     kafka_outbox_topic: str = "notifications.outbox"
+    kafka_outbox_partitions: int = 1
+    kafka_priority_topic: str = "notifications.outbox.high"
+    priority_lanes_enabled: bool = False
     kafka_dlq_topic: str = "notifications.dlq"
     kafka_consumer_group: str = "notification-worker"
+    kafka_retry_topics_enabled: bool = False
+    kafka_retry_topic_prefix: str = "notifications.retry"
+
+    consumer_max_in_flight: int = 1
+    consumer_max_in_flight_per_partition: int = 1
+    consumer_batch_enabled: bool = False
+    consumer_batch_max_records: int = 500
+    consumer_batch_max_wait_ms: int = 100
+    consumer_commit_interval_ms: int = 0
+    consumer_priority_max_in_flight: int = 1
+    consumer_priority_poll_weight: int = 4
+    consumer_pause_high_watermark: int = 0
+    consumer_pause_low_watermark: int = 0
+    consumer_pause_high_watermark_bytes: int = 0
+    consumer_pause_low_watermark_bytes: int = 0
+
+    worker_processes: int = 1
+    worker_supervisor_interval_seconds: float = 2.0
+    worker_restart_backoff_seconds: float = 1.0
+    worker_restart_backoff_max_seconds: float = 60.0
+    worker_shutdown_timeout_seconds: float = 30.0
+    shutdown_drain_timeout_seconds: float = 25.0
 
     db_host: str = "notifications-db"
     db_port: int = 5432
@@ -27,6 +54,13 @@ class Settings(BaseSettings):
     db_password: str = "notifications"
 
     db_echo: bool = False
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 5
+    db_pool_max_inactive_seconds: float = 300.0
+    db_command_timeout_seconds: float = 0.0
+    db_statement_cache_size: int = 100
+    db_prepare_statements: bool = True
+    db_pgbouncer_mode: bool = False
 
     @property
     def db_dsn(self) -> str:
@@ -46,7 +80,33 @@ class Settings(BaseSettings):
     retry_delays_seconds_raw: str = "1,3,10"
     max_send_delay_seconds: int = 300
 
+    delayed_jobs_enabled: bool = False
+    delayed_jobs_min_delay_seconds: float = 1.0
+    delayed_jobs_poll_interval_seconds: float = 5.0
+    delayed_jobs_dispatch_batch_size: int = 500
+
+    channel_concurrency_raw: str = ""
+    channel_queue_depth_raw: str = ""
+
     auth_base_url: Optional[str] = None
+    auth_http_timeout_seconds: float = 2.0
+    auth_http_connect_timeout_seconds: float = 0.5
+    auth_http_max_connections: int = 100
+    auth_http_max_keepalive_connections: int = 20
+    auth_http_keepalive_expiry_seconds: float = 30.0
+    auth_http2_enabled: bool = False
+    auth_circuit_failure_threshold: int = 5
+    auth_circuit_reset_seconds: float = 10.0
+    contact_cache_size: int = 10000
+    contact_cache_ttl_seconds: float = 60.0
+    contact_cache_negative_ttl_seconds: float = 30.0
+    contact_cache_stale_seconds: float = 300.0
+    auth_batch_enabled: bool = False
+    auth_batch_window_ms: float = 5.0
+    auth_batch_max_size: int = 100
+    campaign_prefetch_enabled: bool = True
+    campaign_contacts_ttl_seconds: float = 120.0
+    campaign_contacts_max_campaigns: int = 64
 
     @property
     def retry_delays_seconds(self) -> List[float]:
@@ -64,12 +124,82 @@ class Settings(BaseSettings):
                 "Invalid RETRY_DELAYS_SECONDS_RAW. Expected comma-separated numbers, e.g. '1,3,10'."
             ) from e
 
+    @property
+    def channel_concurrency(self) -> Dict[str, int]:
+        return _parse_channel_limits(
+            self.channel_concurrency_raw, "CHANNEL_CONCURRENCY_RAW"
+        )
+
+    @property
+    def channel_queue_depth(self) -> Dict[str, int]:
+        return _parse_channel_limits(
+            self.channel_queue_depth_raw, "CHANNEL_QUEUE_DEPTH_RAW"
+        )
+
+    def retry_topic_for_delay(self, delay: float) -> str:
+        return f"{self.kafka_retry_topic_prefix}.{delay:g}s"
+
+    def outbox_topic_for(self, priority: str) -> str:
+        if self.priority_lanes_enabled and priority == NotificationPriority.HIGH:
+            return self.kafka_priority_topic
+        return self.kafka_outbox_topic
+
+    @property
+    def kafka_retry_topics(self) -> List[str]:
+        topics = [self.retry_topic_for_delay(d) for d in self.retry_delays_seconds]
+        return list(dict.fromkeys(topics))
+
     api_base_url: str = "http://notifications-api:8000"
     scheduler_poll_interval_seconds: int = 60
 
+    delivery_write_behind_enabled: bool = True
+    delivery_flush_interval_ms: float = 20.0
+    delivery_flush_max_batch: int = 200
+    finished_jobs_cache_size: int = 10000
+    delivery_partition_maintenance_enabled: bool = True
+    delivery_partition_maintenance_interval_seconds: float = 3600.0
+    delivery_partition_months_ahead: int = 2
+    delivery_retention_months: int = 0
+
+    template_cache_size: int = 512
+    template_repo_cache_ttl_seconds: float = 300.0
+    template_repo_negative_ttl_seconds: float = 30.0
+    template_notify_channel: str = "template_changes"
+    template_warmup_enabled: bool = False
+    template_warmup_limit: int = 0
+    template_bytecode_cache_dir: str = ""
+    template_sandbox_enabled: bool = True
+
+    render_executor: str = "none"
+    render_executor_workers: int = 4
+    render_timeout_seconds: float = 0.0
+    render_timeout_grace_seconds: float = 1.0
+    render_max_output_size: int = 0
+
     smtp_host: str = "mailpit"
     smtp_port: int = 1025
     smtp_from: str = "noreply@example.com"
 
+    metrics_path: str = "/tmp/metrics.json"
+    metrics_dump_interval_seconds: float = 15.0
+
+
+def _parse_channel_limits(raw: str, name: str) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for part in raw.split(","):
+        if not part.strip():
+            continue
+        channel, sep, value = part.partition("=")
+        try:
+            if not sep:
+                raise ValueError(part)
+            limits[channel.strip()] = int(value)
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid {name}. Expected comma-separated channel=limit pairs,"
+                " e.g. 'email=10,push=50'."
+            ) from e
+    return limits
+
 
 settings = Settings()
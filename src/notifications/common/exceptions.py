@@ -27,6 +27,42 @@ class TemplateNotFoundError(NotificationServiceError):
         super().__init__(f"Template with id '{template_id}' not found")
 
 
+class InvalidJobPayloadError(NotificationServiceError):
+    def __init__(self, detail: str, invalid_json: bool):
+        self.detail = detail
+        self.invalid_json = invalid_json
+        super().__init__(f"Invalid notification job payload: {detail}")
+
+
+class ChannelBulkheadFullError(NotificationServiceError):
+    def __init__(self, channel: str, queue_depth: int):
+        self.channel = channel
+        self.queue_depth = queue_depth
+        super().__init__(
+            f"Channel '{channel}' is saturated ({queue_depth} jobs already queued)"
+        )
+
+
+class CircuitOpenError(NotificationServiceError):
+    def __init__(self, circuit: str):
+        self.circuit = circuit
+        super().__init__(f"Circuit '{circuit}' is open, call rejected")
+
+
+class TemplateRenderError(NotificationServiceError):
+    retryable = False
+
+
+class TemplateRenderLimitError(TemplateRenderError):
+    def __init__(self, limit: str, value: float):
+        self.limit = limit
+        self.value = value
+        super().__init__(f"Template render exceeded {limit} limit ({value:g})")
+
+    def __reduce__(self):
+        return type(self), (self.limit, self.value)
+
+
 # class NotificationSendError(NotificationServiceError):
 #     """Ошибка отправки уведомления через внешний сервис."""
 #     pass
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import time
 from pathlib import Path
 
@@ -8,6 +9,32 @@ READY_PATH = Path("/tmp/ready")
 HEARTBEAT_PATH = Path("/tmp/heartbeat")
 
 
+def instance_paths(instance: str) -> tuple[Path, Path]:
+    return (
+        READY_PATH.with_name(f"{READY_PATH.name}.{instance}"),
+        HEARTBEAT_PATH.with_name(f"{HEARTBEAT_PATH.name}.{instance}"),
+    )
+
+
+def use_instance_paths(instance: str) -> None:
+    global READY_PATH, HEARTBEAT_PATH
+    READY_PATH, HEARTBEAT_PATH = instance_paths(instance)
+
+
+def read_heartbeat(path: Path) -> float | None:
+    try:
+        return float(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_heartbeat(timestamp: float | None = None) -> None:
+    # Write then rename so readers never see a truncated timestamp.
+    tmp_path = HEARTBEAT_PATH.with_name(f"{HEARTBEAT_PATH.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(str(time.time() if timestamp is None else timestamp))
+    os.replace(tmp_path, HEARTBEAT_PATH)
+
+
 def mark_ready() -> None:
     READY_PATH.write_text("ok\n")
 
@@ -26,7 +53,7 @@ def is_ready() -> bool:
 async def heartbeat_loop(interval_sec: float = 5.0) -> None:
     while True:
         try:
-            HEARTBEAT_PATH.write_text(str(time.time()))
+            write_heartbeat()
         except Exception:
             pass
         await asyncio.sleep(interval_sec)
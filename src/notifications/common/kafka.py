@@ -1,19 +1,26 @@
-import asyncio
-import json
 import logging
 from typing import Any, Dict, Optional
 
 from aiokafka import AIOKafkaProducer, errors
 
+from notifications.common.codec import encode_json
+from notifications.common.config import Settings
 from notifications.common.retry import retry_async
+from notifications.common.schemas import NotificationJob
 
 logger = logging.getLogger(__name__)
 
 
 class KafkaNotificationJobPublisher:
-    def __init__(self, bootstrap_servers: str, topic: str) -> None:
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        topic: str,
+        settings: Optional[Settings] = None,
+    ) -> None:
         self._bootstrap_servers = bootstrap_servers
         self._topic = topic
+        self._settings = settings
         self._producer: Optional[AIOKafkaProducer] = None
         self._enabled: bool = True
 
@@ -27,7 +34,7 @@ class KafkaNotificationJobPublisher:
         async def _start_producer():
             producer = AIOKafkaProducer(
                 bootstrap_servers=self._bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
+                value_serializer=encode_json,
             )
             try:
                 await producer.start()
@@ -73,18 +80,29 @@ class KafkaNotificationJobPublisher:
         finally:
             self._producer = None
 
-    async def publish_job(self, payload: Dict[str, Any]) -> None:
+    def _topic_for(self, payload: NotificationJob | Dict[str, Any]) -> str:
+        if self._settings is None:
+            return self._topic
+
+        if isinstance(payload, NotificationJob):
+            priority = payload.meta.priority
+        else:
+            priority = (payload.get("meta") or {}).get("priority")
+        return self._settings.outbox_topic_for(priority)
+
+    async def publish_job(self, payload: NotificationJob | Dict[str, Any]) -> None:
+        topic = self._topic_for(payload)
         if not self._enabled or self._producer is None:
             logger.info(
                 "Kafka degraded mode: would publish topic=%s payload=%s",
-                self._topic,
+                topic,
                 payload,
             )
             return
 
         try:
-            await self._producer.send_and_wait(self._topic, payload)
+            await self._producer.send_and_wait(topic, payload)
         except errors.KafkaError:
-            logger.exception("Kafka error while publishing topic=%s", self._topic)
+            logger.exception("Kafka error while publishing topic=%s", topic)
         except Exception:
-            logger.exception("Unexpected error while publishing topic=%s", self._topic)
+            logger.exception("Unexpected error while publishing topic=%s", topic)
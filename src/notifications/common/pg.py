@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+from notifications.common.config import Settings
+from notifications.common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedConnection(asyncpg.Connection):
+    __slots__ = ("prepared_statements",)
+
+
+class StatementRegistry:
+    """Hot queries, prepared once per pooled connection by the pool's init hook.
+
+    Repositories call ``statements.fetchrow(conn, NAME, ...)``; when a
+    connection has no prepared copy (PgBouncer mode, pools created elsewhere)
+    the raw SQL is run instead.
+    """
+
+    def __init__(self) -> None:
+        self._sql: dict[str, str] = {}
+        self._m_fallbacks = metrics.counter("pg_statement_unprepared_total")
+
+    def register(self, name: str, sql: str) -> str:
+        if self._sql.get(name, sql) != sql:
+            raise ValueError(f"Statement {name!r} is already registered")
+        self._sql[name] = sql
+        return name
+
+    async def prepare_all(self, conn: asyncpg.Connection) -> None:
+        prepared = {}
+        for name, sql in self._sql.items():
+            prepared[name] = await conn.prepare(sql)
+        conn.prepared_statements = prepared
+        logger.debug("Prepared %s statements on connection", len(prepared))
+
+    async def fetch(self, conn, name: str, *args) -> list[asyncpg.Record]:
+        stmt = self._prepared(conn, name)
+        if stmt is None:
+            return await conn.fetch(self._sql[name], *args)
+        return await stmt.fetch(*args)
+
+    async def fetchrow(self, conn, name: str, *args) -> asyncpg.Record | None:
+        stmt = self._prepared(conn, name)
+        if stmt is None:
+            return await conn.fetchrow(self._sql[name], *args)
+        return await stmt.fetchrow(*args)
+
+    async def fetchval(self, conn, name: str, *args) -> Any:
+        stmt = self._prepared(conn, name)
+        if stmt is None:
+            return await conn.fetchval(self._sql[name], *args)
+        return await stmt.fetchval(*args)
+
+    async def execute(self, conn, name: str, *args) -> None:
+        stmt = self._prepared(conn, name)
+        if stmt is None:
+            await conn.execute(self._sql[name], *args)
+        else:
+            # PreparedStatement has no execute(); fetch() of a DML statement
+            # without RETURNING simply yields no rows.
+            await stmt.fetch(*args)
+
+    async def executemany(self, conn, name: str, args: list[tuple]) -> None:
+        stmt = self._prepared(conn, name)
+        if stmt is None:
+            await conn.executemany(self._sql[name], args)
+        else:
+            await stmt.executemany(args)
+
+    def _prepared(self, conn, name: str) -> PreparedStatement | None:
+        prepared = getattr(conn, "prepared_statements", None)
+        if not isinstance(prepared, dict):
+            self._m_fallbacks.inc()
+            return None
+        return prepared.get(name)
+
+
+statements = StatementRegistry()
+
+
+async def create_pool(settings: Settings) -> asyncpg.Pool:
+    # PgBouncer in transaction mode hands each transaction to whichever server
+    # connection is free, so named prepared statements and asyncpg's statement
+    # cache would point at the wrong backend.
+    pgbouncer = settings.db_pgbouncer_mode
+    prepare = settings.db_prepare_statements and not pgbouncer
+
+    return await asyncpg.create_pool(
+        dsn=settings.db_asyncpg_dsn,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_seconds,
+        command_timeout=settings.db_command_timeout_seconds or None,
+        statement_cache_size=0 if pgbouncer else settings.db_statement_cache_size,
+        connection_class=PreparedConnection,
+        init=statements.prepare_all if prepare else None,
+    )
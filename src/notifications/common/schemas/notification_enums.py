@@ -5,6 +5,7 @@ except ImportError:
 
 
 class NotificationStatus(StrEnum):
+    PROCESSING = "PROCESSING"
     SENT = "SENT"
     FAILED = "FAILED"
     RETRYING = "RETRYING"
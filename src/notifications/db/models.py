@@ -5,11 +5,14 @@ from enum import Enum
 from uuid import UUID
 
 from sqlalchemy import (
+    BigInteger,
+    Sequence,
     String,
     Text,
     Integer,
     DateTime,
     func,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
@@ -21,6 +24,7 @@ class Base(DeclarativeBase):
 
 
 class DeliveryStatus(str, Enum):
+    PROCESSING = "PROCESSING"
     SENT = "SENT"
     FAILED = "FAILED"
     RETRYING = "RETRYING"
@@ -64,10 +68,12 @@ class Template(Base):
 
 
 class NotificationDelivery(Base):
+    # Range-partitioned by created_at (the job's creation time), so the
+    # primary key has to include it. Partitions are managed by the worker.
+    # Only the current state lives here; attempt details go to
+    # notification_attempts.
     __tablename__ = "notification_delivery"
-    __table_args__ = (
-        UniqueConstraint("job_id", name="uq_notification_delivery_job_id"),
-    )
+    __table_args__ = ({"postgresql_partition_by": "RANGE (created_at)"},)
 
     job_id: Mapped[UUID] = mapped_column(
         PGUUID(as_uuid=True),
@@ -89,15 +95,13 @@ class NotificationDelivery(Base):
         server_default="0",
     )
 
-    error_code: Mapped[str | None] = mapped_column(String(100))
-    error_message: Mapped[str | None] = mapped_column(Text)
-
     sent_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
     )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
     )
     updated_at: Mapped[datetime] = mapped_column(
@@ -107,6 +111,48 @@ class NotificationDelivery(Base):
     )
 
 
+class NotificationDeliveryKey(Base):
+    # Keeps job_id unique across notification_delivery partitions and records
+    # the created_at each job's row is stored under.
+    __tablename__ = "notification_delivery_keys"
+
+    job_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        primary_key=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class NotificationAttempt(Base):
+    # Append-only log, partitioned like notification_delivery by the job's
+    # creation time.
+    __tablename__ = "notification_attempts"
+    __table_args__ = (
+        Index("ix_notification_attempts_job_id", "job_id", "job_created_at"),
+        {"postgresql_partition_by": "RANGE (job_created_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        Sequence("notification_attempts_id_seq"),
+        primary_key=True,
+    )
+    job_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True))
+    job_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    attempt: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(20))
+    error_code: Mapped[str | None] = mapped_column(String(100))
+    error_message: Mapped[str | None] = mapped_column(Text)
+
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+
 class Campaign(Base):
     __tablename__ = "campaigns"
 
@@ -141,3 +187,17 @@ class Campaign(Base):
     max_runs: Mapped[int | None] = mapped_column(
         Integer,
     )
+
+
+class ScheduledJob(Base):
+    __tablename__ = "scheduled_jobs"
+    __table_args__ = (Index("ix_scheduled_jobs_due_at", "due_at"),)
+
+    job_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    payload: Mapped[str] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
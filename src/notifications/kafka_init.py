@@ -73,30 +73,29 @@ async def create_topics() -> None:
         existing: List[str] = list(await admin.list_topics())
         logger.info("Existing topics: %s", existing)
 
-        topics_to_create: list[NewTopic] = []
-        if settings.kafka_outbox_topic not in existing:
-            topics_to_create.append(
-                NewTopic(
-                    name=settings.kafka_outbox_topic,
-                    num_partitions=1,
-                    replication_factor=1,
-                )
-            )
-        if settings.kafka_dlq_topic not in existing:
-            topics_to_create.append(
-                NewTopic(
-                    name=settings.kafka_dlq_topic,
-                    num_partitions=1,
-                    replication_factor=1,
-                )
+        wanted: list[str] = [settings.kafka_outbox_topic, settings.kafka_dlq_topic]
+        if settings.priority_lanes_enabled:
+            wanted.append(settings.kafka_priority_topic)
+        if settings.kafka_retry_topics_enabled:
+            wanted.extend(settings.kafka_retry_topics)
+
+        topics_to_create: list[NewTopic] = [
+            NewTopic(
+                name=topic,
+                num_partitions=(
+                    settings.kafka_outbox_partitions
+                    if topic
+                    in (settings.kafka_outbox_topic, settings.kafka_priority_topic)
+                    else 1
+                ),
+                replication_factor=1,
             )
+            for topic in wanted
+            if topic not in existing
+        ]
 
         if not topics_to_create:
-            logger.info(
-                "Topics already exist, nothing to create (outbox=%s, dlq=%s)",
-                settings.kafka_outbox_topic,
-                settings.kafka_dlq_topic,
-            )
+            logger.info("Topics already exist, nothing to create (%s)", wanted)
             return
 
         await admin.create_topics(new_topics=topics_to_create)
@@ -1,9 +1,11 @@
+import json
 from collections.abc import Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from notifications.common.config import settings
 from notifications.common.schemas import NotificationChannel
 from notifications.notifications_api.schemas.template import (
     TemplateCreate,
@@ -50,6 +52,20 @@ class TemplateRepository:
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def _notify_changed(self, template: Template) -> None:
+        # NOTIFY is transactional: workers only hear about it once we commit.
+        payload = json.dumps(
+            {
+                "template_code": template.template_code,
+                "locale": template.locale,
+                "channel": template.channel,
+            }
+        )
+        await self._session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": settings.template_notify_channel, "payload": payload},
+        )
+
     async def create(self, data: TemplateCreate) -> Template:
         tpl = Template(
             id=uuid4(),
@@ -60,6 +76,7 @@ class TemplateRepository:
             body=data.body,
         )
         self._session.add(tpl)
+        await self._notify_changed(tpl)
         await self._session.commit()
         await self._session.refresh(tpl)
         return tpl
@@ -74,6 +91,7 @@ class TemplateRepository:
         if data.body is not None:
             template.body = data.body
 
+        await self._notify_changed(template)
         await self._session.commit()
         await self._session.refresh(template)
         return template
@@ -28,7 +28,7 @@ class NotificationService:
         jobs = self._map_event_to_jobs(event)
 
         for job in jobs:
-            await self._job_publisher.publish_job(job.model_dump(mode="json"))
+            await self._job_publisher.publish_job(job)
 
         return len(jobs)
 
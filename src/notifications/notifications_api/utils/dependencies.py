@@ -29,6 +29,7 @@ def get_kafka_publisher() -> KafkaNotificationJobPublisher:
     return KafkaNotificationJobPublisher(
         bootstrap_servers=settings.kafka_bootstrap_servers,
         topic=settings.kafka_outbox_topic,
+        settings=settings,
     )
 
 
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+from notifications.common.metrics import metrics
+
+if TYPE_CHECKING:
+    from notifications.worker.auth.client import UserContacts
+
+logger = logging.getLogger(__name__)
+
+FetchOneFn = Callable[[UUID], Awaitable[Optional["UserContacts"]]]
+FetchManyFn = Callable[[list[UUID]], Awaitable[dict[UUID, Optional["UserContacts"]]]]
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+class BulkLookupNotSupportedError(Exception):
+    pass
+
+
+class ContactBatchLoader:
+    def __init__(
+        self,
+        fetch_one: FetchOneFn,
+        fetch_many: FetchManyFn,
+        window_seconds: float,
+        max_batch_size: int,
+    ) -> None:
+        self._fetch_one = fetch_one
+        self._fetch_many = fetch_many
+        self._window = window_seconds
+        self._max_batch_size = max_batch_size
+        self._bulk_supported = True
+
+        self._queue: dict[UUID, asyncio.Future] = {}
+        self._in_flight: dict[UUID, asyncio.Future] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        self._m_batch_size = metrics.histogram(
+            "auth_contact_batch_size", buckets=BATCH_SIZE_BUCKETS
+        )
+        self._m_coalesced = metrics.counter("auth_contact_coalesced_total")
+        self._m_fallbacks = metrics.counter("auth_contact_batch_fallbacks_total")
+
+    async def load(self, user_id: UUID) -> UserContacts | None:
+        future = self._queue.get(user_id) or self._in_flight.get(user_id)
+        if future is not None:
+            self._m_coalesced.inc()
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue[user_id] = future
+        if len(self._queue) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._window, self._flush
+            )
+        return await asyncio.shield(future)
+
+    async def load_many(
+        self, user_ids: Iterable[UUID]
+    ) -> dict[UUID, UserContacts | None]:
+        ids = list(dict.fromkeys(user_ids))
+        results = await asyncio.gather(
+            *(self.load(user_id) for user_id in ids), return_exceptions=True
+        )
+        return {
+            user_id: result
+            for user_id, result in zip(ids, results)
+            if not isinstance(result, BaseException)
+        }
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, {}
+        if not batch:
+            return
+
+        self._in_flight.update(batch)
+        task = asyncio.create_task(self._resolve(batch), name="auth-contact-batch")
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve(self, batch: dict[UUID, asyncio.Future]) -> None:
+        self._m_batch_size.observe(len(batch))
+        ids = list(batch)
+        try:
+            results = await self._fetch(ids)
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()
+        else:
+            for user_id, future in batch.items():
+                if future.done():
+                    continue
+                result = results.get(user_id)
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                    future.exception()
+                else:
+                    future.set_result(result)
+        finally:
+            for user_id in ids:
+                self._in_flight.pop(user_id, None)
+
+    async def _fetch(self, ids: list[UUID]) -> dict:
+        if self._bulk_supported and len(ids) > 1:
+            try:
+                return await self._fetch_many(ids)
+            except BulkLookupNotSupportedError:
+                logger.warning(
+                    "Auth service has no bulk user lookup, falling back to"
+                    " parallel single lookups"
+                )
+                self._bulk_supported = False
+
+        if len(ids) > 1:
+            self._m_fallbacks.inc()
+        results = await asyncio.gather(
+            *(self._fetch_one(user_id) for user_id in ids), return_exceptions=True
+        )
+        return dict(zip(ids, results))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from notifications.common.exceptions import CircuitOpenError
+from notifications.common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Fails calls fast after repeated failures, probing again after a cooldown.
+
+    While open every call is rejected; once ``reset_timeout_seconds`` pass a
+    single probe is let through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int, reset_timeout_seconds: float
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        labels = {"circuit": name}
+        self._m_state = metrics.gauge("circuit_breaker_state", labels)
+        self._m_rejected = metrics.counter("circuit_breaker_rejected_total", labels)
+        self._m_opened = metrics.counter("circuit_breaker_opened_total", labels)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> None:
+        if self._state == OPEN:
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                self._reject()
+            self._set_state(HALF_OPEN)
+
+        if self._state == HALF_OPEN:
+            if self._probe_in_flight:
+                self._reject()
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._probe_in_flight = False
+        self._failures = 0
+        if self._state != CLOSED:
+            logger.info("Circuit %s closed", self.name)
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != OPEN:
+                logger.warning(
+                    "Circuit %s opened after %s failures", self.name, self._failures
+                )
+                self._m_opened.inc()
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def record_abandoned(self) -> None:
+        # The call ended without a verdict (e.g. cancelled): free the probe slot.
+        self._probe_in_flight = False
+
+    def _reject(self) -> None:
+        self._m_rejected.inc()
+        raise CircuitOpenError(self.name)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        self._m_state.set(_STATE_VALUES[state])
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from dataclasses import dataclass
+from typing import Iterable
 from uuid import UUID
 import logging
 
 import httpx
 
 from notifications.common.config import Settings
+from notifications.common.metrics import metrics
+from notifications.worker.auth.batch_loader import (
+    BulkLookupNotSupportedError,
+    ContactBatchLoader,
+)
+from notifications.worker.auth.circuit_breaker import CircuitBreaker
+from notifications.worker.auth.contact_cache import ContactCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +35,36 @@ class AuthClient:
     ) -> None:
         self._settings = settings
         self._http = http
+        self._cache = (
+            ContactCache(
+                maxsize=settings.contact_cache_size,
+                ttl_seconds=settings.contact_cache_ttl_seconds,
+                negative_ttl_seconds=settings.contact_cache_negative_ttl_seconds,
+                stale_seconds=settings.contact_cache_stale_seconds,
+            )
+            if settings.contact_cache_size > 0
+            else None
+        )
+        self._loader = (
+            ContactBatchLoader(
+                fetch_one=self._fetch_contacts,
+                fetch_many=self._fetch_contacts_many,
+                window_seconds=settings.auth_batch_window_ms / 1000,
+                max_batch_size=settings.auth_batch_max_size,
+            )
+            if settings.auth_batch_enabled
+            else None
+        )
+        self._breaker = (
+            CircuitBreaker(
+                "auth",
+                failure_threshold=settings.auth_circuit_failure_threshold,
+                reset_timeout_seconds=settings.auth_circuit_reset_seconds,
+            )
+            if settings.auth_circuit_failure_threshold > 0
+            else None
+        )
+        self._m_lookup = metrics.histogram("auth_contact_lookup_seconds")
 
     async def get_user_contacts(self, user_id: UUID) -> UserContacts:
         if not self._settings.auth_base_url:
@@ -33,21 +73,113 @@ class AuthClient:
         if self._http is None:
             return self._fake_contacts(user_id)
 
-        url = f"{self._settings.auth_base_url}/api/v1/users/{user_id}"
-
+        started = time.monotonic()
         try:
-            resp = await self._http.get(url)
-            resp.raise_for_status()
-            data = resp.json()
+            if self._cache is not None:
+                contacts = await self._cache.get(user_id, self._lookup)
+            else:
+                contacts = await self._lookup(user_id)
         except Exception as exc:
             logger.warning(
-                "AuthClient: failed to fetch user %s from %s: %s - using fake contacts",
+                "AuthClient: failed to fetch user %s: %s - using fake contacts",
                 user_id,
-                url,
                 exc,
             )
             return self._fake_contacts(user_id)
+        finally:
+            self._m_lookup.observe(time.monotonic() - started)
+
+        if contacts is None:
+            logger.warning(
+                "AuthClient: user %s not found - using fake contacts", user_id
+            )
+            return self._fake_contacts(user_id)
+        return contacts
+
+    async def get_many_user_contacts(
+        self, user_ids: Iterable[UUID]
+    ) -> dict[UUID, UserContacts]:
+        # With batching enabled the concurrent lookups below leave as a
+        # handful of bulk requests instead of one request per user.
+        ids = list(dict.fromkeys(user_ids))
+        contacts = await asyncio.gather(*(self.get_user_contacts(i) for i in ids))
+        return dict(zip(ids, contacts))
+
+    async def _lookup(self, user_id: UUID) -> UserContacts | None:
+        if self._loader is not None:
+            return await self._loader.load(user_id)
+        return await self._fetch_contacts(user_id)
 
+    async def _fetch_contacts(self, user_id: UUID) -> UserContacts | None:
+        url = f"{self._settings.auth_base_url}/api/v1/users/{user_id}"
+
+        resp = await self._request("user", "GET", url)
+        if resp.status_code == httpx.codes.NOT_FOUND:
+            return None
+        resp.raise_for_status()
+        return self._contacts_from(user_id, resp.json())
+
+    async def _fetch_contacts_many(
+        self, user_ids: list[UUID]
+    ) -> dict[UUID, UserContacts | None]:
+        url = f"{self._settings.auth_base_url}/api/v1/users:batch"
+
+        resp = await self._request(
+            "users_batch",
+            "POST",
+            url,
+            json={"user_ids": [str(user_id) for user_id in user_ids]},
+        )
+        if resp.status_code in (
+            httpx.codes.NOT_FOUND,
+            httpx.codes.METHOD_NOT_ALLOWED,
+            httpx.codes.NOT_IMPLEMENTED,
+        ):
+            raise BulkLookupNotSupportedError(url)
+        resp.raise_for_status()
+
+        found = {UUID(str(item["id"])): item for item in resp.json()["users"]}
+        return {
+            user_id: (
+                self._contacts_from(user_id, found[user_id])
+                if user_id in found
+                else None
+            )
+            for user_id in user_ids
+        }
+
+    async def _request(
+        self, endpoint: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        if self._breaker is not None:
+            self._breaker.before_call()
+
+        started = time.monotonic()
+        try:
+            resp = await self._http.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if self._breaker is not None:
+                self._breaker.record_failure()
+            raise
+        except BaseException:
+            if self._breaker is not None:
+                self._breaker.record_abandoned()
+            raise
+        finally:
+            metrics.histogram(
+                "auth_http_request_seconds", {"endpoint": endpoint}
+            ).observe(time.monotonic() - started)
+
+        if self._breaker is not None:
+            # 501 is how a service without the bulk endpoint may answer.
+            if resp.is_server_error and resp.status_code != httpx.codes.NOT_IMPLEMENTED:
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+        return resp
+
+    @staticmethod
+    def _contacts_from(user_id: UUID, data: dict) -> UserContacts:
         return UserContacts(
             user_id=user_id,
             email=data.get("email"),
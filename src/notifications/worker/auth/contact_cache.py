@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from uuid import UUID
+
+from notifications.common.metrics import metrics
+
+if TYPE_CHECKING:
+    from notifications.worker.auth.client import UserContacts
+
+logger = logging.getLogger(__name__)
+
+ContactsLoader = Callable[[UUID], Awaitable[Optional["UserContacts"]]]
+
+
+class ContactCache:
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        stale_seconds: float = 0.0,
+    ) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._stale = stale_seconds
+        self._entries: OrderedDict[UUID, tuple[float, UserContacts | None]] = (
+            OrderedDict()
+        )
+        self._loading: dict[UUID, asyncio.Task] = {}
+        self._refreshing: set[asyncio.Task] = set()
+
+        self._m_hits = metrics.counter("contact_cache_hits_total")
+        self._m_negative_hits = metrics.counter("contact_cache_negative_hits_total")
+        self._m_stale_hits = metrics.counter("contact_cache_stale_hits_total")
+        self._m_misses = metrics.counter("contact_cache_misses_total")
+        self._m_size = metrics.gauge("contact_cache_size")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, user_id: UUID, loader: ContactsLoader) -> UserContacts | None:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            stored_at, contacts = entry
+            age = time.monotonic() - stored_at
+            ttl = self._ttl if contacts is not None else self._negative_ttl
+
+            if age < ttl:
+                self._entries.move_to_end(user_id)
+                if contacts is None:
+                    self._m_negative_hits.inc()
+                else:
+                    self._m_hits.inc()
+                return contacts
+
+            if contacts is not None and age < ttl + self._stale:
+                self._m_stale_hits.inc()
+                self._refresh_in_background(user_id, loader)
+                return contacts
+
+        self._m_misses.inc()
+        return await self._load(user_id, loader)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._entries.pop(user_id, None)
+        self._m_size.set(len(self._entries))
+
+    def put(self, user_id: UUID, contacts: UserContacts | None) -> None:
+        self._entries[user_id] = (time.monotonic(), contacts)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        self._m_size.set(len(self._entries))
+
+    async def _load(self, user_id: UUID, loader: ContactsLoader) -> UserContacts | None:
+        # The lookup runs in its own task so a cancelled caller doesn't
+        # cancel it for everyone else waiting on the same user.
+        task = self._loading.get(user_id)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch(user_id, loader), name=f"contacts-load-{user_id}"
+            )
+            self._loading[user_id] = task
+            task.add_done_callback(lambda t: self._loaded(user_id, t))
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, user_id: UUID, loader: ContactsLoader
+    ) -> UserContacts | None:
+        contacts = await loader(user_id)
+        self.put(user_id, contacts)
+        return contacts
+
+    def _loaded(self, user_id: UUID, task: asyncio.Task) -> None:
+        if self._loading.get(user_id) is task:
+            del self._loading[user_id]
+        if not task.cancelled():
+            # Nobody else may be waiting; don't leave "exception never retrieved".
+            task.exception()
+
+    def _refresh_in_background(self, user_id: UUID, loader: ContactsLoader) -> None:
+        if user_id in self._loading:
+            return
+
+        async def _refresh() -> None:
+            try:
+                await self._load(user_id, loader)
+            except Exception as exc:
+                logger.warning("Failed to refresh contacts for %s: %s", user_id, exc)
+
+        task = asyncio.create_task(_refresh(), name=f"contacts-refresh-{user_id}")
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
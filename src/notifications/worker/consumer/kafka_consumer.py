@@ -1,21 +1,40 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-from typing import Any
+import time
+from itertools import chain, zip_longest
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener
 from aiokafka.errors import KafkaError
-from aiokafka.structs import TopicPartition
+from aiokafka.structs import ConsumerRecord, TopicPartition
 
 from notifications.worker.dlq import DlqPublisher
-from notifications.common.schemas import NotificationJob
+from notifications.common.codec import decode_job
+from notifications.common.exceptions import InvalidJobPayloadError
 from notifications.common.config import Settings
+from notifications.common.metrics import metrics
+from notifications.common.schemas import NotificationJob
+from notifications.worker.consumer.offsets import OffsetTracker
 from notifications.worker.processor import JobProcessor
+from notifications.worker.retry import parse_retry_headers
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _RebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, owner: KafkaNotificationConsumer) -> None:
+        self._owner = owner
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        await self._owner._on_partitions_revoked(set(revoked))
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        logger.info("Partitions assigned: %s", sorted(assigned))
+        self._owner._on_partitions_assigned(set(assigned))
+
 
 class KafkaNotificationConsumer:
     def __init__(
@@ -29,40 +48,128 @@ class KafkaNotificationConsumer:
         self._dlq = dlq_publisher
         self._consumer: AIOKafkaConsumer | None = None
         self._stopped = asyncio.Event()
+        self._running = False
+        self._finished = asyncio.Event()
+        self._drain_deadline: float | None = None
+
+        self._tracker = OffsetTracker()
+        self._in_flight = asyncio.Semaphore(settings.consumer_max_in_flight)
+        self._partition_slots: dict[TopicPartition, asyncio.Semaphore] = {}
+        self._tasks: dict[asyncio.Task, TopicPartition] = {}
+        self._commit_needed = asyncio.Event()
+        self._fatal_error: BaseException | None = None
+
+        self._batch_enabled = settings.consumer_batch_enabled
+        self._max_records = (
+            settings.consumer_batch_max_records if self._batch_enabled else 1
+        )
+        self._last_commit_at: float | None = None
+
+        self._retry_topics: set[str] = (
+            set(settings.kafka_retry_topics)
+            if settings.kafka_retry_topics_enabled
+            else set()
+        )
+        self._deferred: dict[TopicPartition, asyncio.TimerHandle] = {}
+
+        self._priority_topic: str | None = (
+            settings.kafka_priority_topic if settings.priority_lanes_enabled else None
+        )
+        self._priority_slots = asyncio.Semaphore(
+            settings.consumer_priority_max_in_flight
+        )
+
+        self._m_batch_size = metrics.histogram(
+            "kafka_consumer_batch_size", buckets=BATCH_SIZE_BUCKETS
+        )
+        self._m_records = metrics.counter("kafka_consumer_records_total")
+        self._m_commits = metrics.counter("kafka_consumer_commits_total")
+        self._m_commit_failures = metrics.counter(
+            "kafka_consumer_commit_failures_total"
+        )
+        self._m_commit_interval = metrics.histogram(
+            "kafka_consumer_commit_interval_seconds"
+        )
+        self._m_commit_partitions = metrics.histogram(
+            "kafka_consumer_commit_partitions", buckets=BATCH_SIZE_BUCKETS
+        )
+        self._m_in_flight = metrics.gauge("kafka_consumer_in_flight")
+        self._pause_high = settings.consumer_pause_high_watermark
+        self._pause_low = settings.consumer_pause_low_watermark or self._pause_high // 2
+        self._pause_high_bytes = settings.consumer_pause_high_watermark_bytes
+        self._pause_low_bytes = (
+            settings.consumer_pause_low_watermark_bytes or self._pause_high_bytes // 2
+        )
+        self._in_flight_jobs = 0
+        self._in_flight_bytes = 0
+        self._backpressure_since: float | None = None
+
+        self._m_priority_in_flight = metrics.gauge("kafka_consumer_priority_in_flight")
+        self._m_priority_records = metrics.counter(
+            "kafka_consumer_priority_records_total"
+        )
+        self._m_deferred = metrics.counter("kafka_consumer_retry_deferrals_total")
+        self._m_in_flight_bytes = metrics.gauge("kafka_consumer_in_flight_bytes")
+        self._m_paused = metrics.gauge("kafka_consumer_backpressure_paused")
+        self._m_pauses = metrics.counter("kafka_consumer_backpressure_pauses_total")
+        self._m_paused_seconds = metrics.counter(
+            "kafka_consumer_backpressure_paused_seconds_total"
+        )
 
     async def start(self) -> None:
         self._consumer = AIOKafkaConsumer(
-            self._settings.kafka_outbox_topic,
             bootstrap_servers=self._settings.kafka_bootstrap_servers,
             group_id=self._settings.kafka_consumer_group,
             enable_auto_commit=False,
             value_deserializer=lambda v: v,
         )
+        topics = [self._settings.kafka_outbox_topic, *sorted(self._retry_topics)]
+        if self._priority_topic is not None:
+            topics.insert(0, self._priority_topic)
+        self._consumer.subscribe(topics, listener=_RebalanceListener(self))
 
         await self._consumer.start()
         logger.info(
-            "Kafka consumer started: topic=%s group=%s bootstrap_servers=%s",
-            self._settings.kafka_outbox_topic,
+            "Kafka consumer started: topics=%s group=%s bootstrap_servers=%s"
+            " max_in_flight=%s max_in_flight_per_partition=%s"
+            " batch_enabled=%s max_records=%s priority_topic=%s",
+            topics,
             self._settings.kafka_consumer_group,
             self._settings.kafka_bootstrap_servers,
+            self._settings.consumer_max_in_flight,
+            self._settings.consumer_max_in_flight_per_partition,
+            self._batch_enabled,
+            self._max_records,
+            self._priority_topic,
         )
 
+        commit_task = asyncio.create_task(self._commit_loop(), name="kafka-committer")
+        priority_streak = 0
+        self._running = True
         try:
-            async for msg in self._consumer:
-                if self._stopped.is_set():
-                    logger.info("Stop flag set, breaking consumer loop")
-                    break
-                await self._handle_message(msg.value)
+            while not self._stopped.is_set():
+                if self._fatal_error is not None:
+                    raise self._fatal_error
 
-                try:
-                    tp = TopicPartition(msg.topic, msg.partition)
-                    await self._consumer.commit({tp: msg.offset + 1})
-                except Exception as e:
-                    logger.exception(
-                        "Failed to commit offset for message %s:%d",
-                        msg.topic,
-                        msg.offset,
-                    )
+                if (
+                    self._priority_topic is not None
+                    and priority_streak < self._settings.consumer_priority_poll_weight
+                ):
+                    if await self._poll_priority(timeout_ms=0):
+                        priority_streak += 1
+                        continue
+                priority_streak = 0
+
+                batch = await self._consumer.getmany(
+                    timeout_ms=self._settings.consumer_batch_max_wait_ms,
+                    max_records=self._max_records,
+                )
+                await self._dispatch_batch(batch)
+
+                if self._batch_enabled:
+                    self._commit_needed.set()
+
+            logger.info("Stop flag set, leaving consumer loop")
 
         except asyncio.CancelledError:
             logger.info("Kafka consumer cancelled")
@@ -70,12 +177,35 @@ class KafkaNotificationConsumer:
         except KafkaError as err:
             logger.exception("Kafka error in consumer loop: %s", err)
         finally:
+            await self._drain_in_flight()
+            commit_task.cancel()
+            await asyncio.gather(commit_task, return_exceptions=True)
+            await self._cancel_in_flight()
+            await self._commit()
+            self._cancel_deferred(list(self._deferred))
+            self._release_backpressure()
             await self._stop_consumer()
+            self._finished.set()
 
     async def stop(self) -> None:
         self._stopped.set()
         await self._stop_consumer()
 
+    async def drain(self, timeout: float) -> None:
+        logger.info("Draining Kafka consumer (timeout=%.1f sec)", timeout)
+        self._drain_deadline = time.monotonic() + timeout
+        self._stopped.set()
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._finished.wait()), timeout)
+        except asyncio.TimeoutError:
+            # The loop can still be blocked on slots held by in-flight jobs;
+            # cancelling them frees the slots so it can exit.
+            logger.warning("Drain deadline exceeded, cancelling in-flight jobs")
+            await self._cancel_in_flight()
+            await self._finished.wait()
+
     async def _stop_consumer(self) -> None:
         if self._consumer is not None:
             logger.info("Stopping Kafka consumer...")
@@ -83,23 +213,403 @@ class KafkaNotificationConsumer:
             logger.info("Kafka consumer stopped")
             self._consumer = None
 
-    async def _handle_message(self, raw_value: bytes) -> None:
+    def _slots_for(self, tp: TopicPartition) -> asyncio.Semaphore:
+        slots = self._partition_slots.get(tp)
+        if slots is None:
+            slots = asyncio.Semaphore(
+                self._settings.consumer_max_in_flight_per_partition
+            )
+            self._partition_slots[tp] = slots
+        return slots
+
+    def _owns(self, tp: TopicPartition) -> bool:
+        return self._consumer is not None and tp in self._consumer.assignment()
+
+    def _priority_partitions(self) -> list[TopicPartition]:
+        if self._priority_topic is None or self._consumer is None:
+            return []
+        return [
+            tp for tp in self._consumer.assignment() if tp.topic == self._priority_topic
+        ]
+
+    async def _poll_priority(self, timeout_ms: int) -> int:
+        tps = self._priority_partitions()
+        if not tps:
+            return 0
+
+        batch = await self._consumer.getmany(
+            *tps, timeout_ms=timeout_ms, max_records=self._max_records
+        )
+        await self._dispatch_batch(batch)
+        if batch and self._batch_enabled:
+            self._commit_needed.set()
+        return sum(len(records) for records in batch.values())
+
+    async def _dispatch_batch(
+        self, batch: dict[TopicPartition, list[ConsumerRecord]]
+    ) -> None:
+        if not batch:
+            return
+
+        size = sum(len(records) for records in batch.values())
+        self._m_batch_size.observe(size)
+        self._m_records.inc(size)
+
+        decoded: dict[tuple[str, int, int], NotificationJob] = {}
+        if self._batch_enabled:
+            decoded = await self._prepare_batch(batch)
+
+        # Pre-rendered output is only freed by handle_job; drop it for every
+        # record that is skipped instead of started.
+        undispatched = dict(decoded)
         try:
-            payload: Any = json.loads(raw_value.decode("utf-8"))
-        except Exception as exc:
-            logger.exception("Failed to decode message from Kafka: %s", exc)
-            await self._dlq.publish_raw(
-                raw_value, error_message="Invalid JSON in Kafka message"
+            await self._dispatch_lanes(batch, decoded, undispatched)
+        finally:
+            if undispatched:
+                self._processor.discard_prerendered(
+                    job.job_id for job in undispatched.values()
+                )
+
+    async def _dispatch_lanes(
+        self,
+        batch: dict[TopicPartition, list[ConsumerRecord]],
+        decoded: dict[tuple[str, int, int], NotificationJob],
+        undispatched: dict[tuple[str, int, int], NotificationJob],
+    ) -> None:
+        priority = [r for tp, r in batch.items() if tp.topic == self._priority_topic]
+        normal = [r for tp, r in batch.items() if tp.topic != self._priority_topic]
+        for lane in (priority, normal):
+            interleaved = chain.from_iterable(zip_longest(*lane))
+            for msg in interleaved:
+                if self._stopped.is_set():
+                    return
+                if msg is None:
+                    continue
+                tp = TopicPartition(msg.topic, msg.partition)
+                if tp in self._deferred or not self._owns(tp):
+                    continue
+                if msg.topic in self._retry_topics and self._defer_if_not_due(tp, msg):
+                    continue
+                key = (msg.topic, msg.partition, msg.offset)
+                if await self._dispatch(msg, decoded.get(key)):
+                    undispatched.pop(key, None)
+
+    async def _prepare_batch(
+        self, batch: dict[TopicPartition, list[ConsumerRecord]]
+    ) -> dict[tuple[str, int, int], NotificationJob]:
+        decoded: dict[tuple[str, int, int], NotificationJob] = {}
+        for tp, records in batch.items():
+            if tp.topic in self._retry_topics:
+                continue
+            for msg in records:
+                try:
+                    decoded[(msg.topic, msg.partition, msg.offset)] = decode_job(
+                        msg.value
+                    )
+                except InvalidJobPayloadError:
+                    continue
+
+        if decoded:
+            try:
+                await self._processor.prepare_batch(list(decoded.values()))
+            except Exception:
+                logger.exception("Failed to pre-render batch, rendering per job")
+        return decoded
+
+    def _defer_if_not_due(self, tp: TopicPartition, msg: ConsumerRecord) -> bool:
+        _, due_at_ms = parse_retry_headers(msg.headers)
+        if due_at_ms is None:
+            return False
+
+        delay = due_at_ms / 1000 - time.time()
+        if delay <= 0:
+            return False
+
+        self._consumer.seek(tp, msg.offset)
+        self._consumer.pause(tp)
+        self._deferred[tp] = asyncio.get_running_loop().call_later(
+            delay, self._resume_deferred, tp
+        )
+        self._m_deferred.inc()
+        logger.debug(
+            "Retry partition %s paused for %.2f sec until offset %s is due",
+            tp,
+            delay,
+            msg.offset,
+        )
+        return True
+
+    def _resume_deferred(self, tp: TopicPartition) -> None:
+        self._deferred.pop(tp, None)
+        if self._backpressure_since is not None:
+            return
+        if self._consumer is not None and tp in self._consumer.assignment():
+            self._consumer.resume(tp)
+
+    def _backpressured_partitions(self) -> list[TopicPartition]:
+        return [
+            tp
+            for tp in self._consumer.assignment()
+            if tp.topic != self._priority_topic and tp not in self._deferred
+        ]
+
+    def _above_high_watermark(self) -> bool:
+        return (0 < self._pause_high <= self._in_flight_jobs) or (
+            0 < self._pause_high_bytes <= self._in_flight_bytes
+        )
+
+    def _below_low_watermark(self) -> bool:
+        jobs_ok = not self._pause_high or self._in_flight_jobs <= self._pause_low
+        bytes_ok = (
+            not self._pause_high_bytes or self._in_flight_bytes <= self._pause_low_bytes
+        )
+        return jobs_ok and bytes_ok
+
+    def _update_backpressure(self) -> None:
+        if self._consumer is None:
+            return
+
+        if self._backpressure_since is None:
+            if not self._above_high_watermark():
+                return
+            tps = self._backpressured_partitions()
+            self._consumer.pause(*tps)
+            self._backpressure_since = time.monotonic()
+            self._m_pauses.inc()
+            self._m_paused.set(1)
+            logger.info(
+                "Backpressure: pausing %s partitions (in_flight=%s bytes=%s)",
+                len(tps),
+                self._in_flight_jobs,
+                self._in_flight_bytes,
             )
+        elif self._below_low_watermark():
+            self._release_backpressure()
+
+    def _release_backpressure(self) -> None:
+        if self._backpressure_since is None:
+            return
+
+        paused_for = time.monotonic() - self._backpressure_since
+        self._backpressure_since = None
+        self._m_paused_seconds.inc(paused_for)
+        self._m_paused.set(0)
+        if self._consumer is not None:
+            self._consumer.resume(*self._backpressured_partitions())
+        logger.info("Backpressure: resumed partitions after %.2f sec", paused_for)
+
+    def _on_partitions_assigned(self, assigned: set[TopicPartition]) -> None:
+        if self._backpressure_since is None or self._consumer is None:
             return
+        tps = [tp for tp in assigned if tp.topic != self._priority_topic]
+        if tps:
+            self._consumer.pause(*tps)
+
+    def _cancel_deferred(self, tps) -> None:
+        for tp in tps:
+            handle = self._deferred.pop(tp, None)
+            if handle is not None:
+                handle.cancel()
+
+    async def _dispatch(
+        self, msg: ConsumerRecord, job: NotificationJob | None = None
+    ) -> bool:
+        tp = TopicPartition(msg.topic, msg.partition)
+        partition_slots = self._slots_for(tp)
+
+        await partition_slots.acquire()
+        lane_slots = await self._acquire_lane(tp)
+
+        # Shutdown or a rebalance may have happened while we waited for slots.
+        if self._stopped.is_set() or not self._owns(tp):
+            partition_slots.release()
+            lane_slots.release()
+            return False
+
+        self._tracker.start(tp, msg.offset)
+        self._m_in_flight.inc()
+        self._in_flight_jobs += 1
+        self._in_flight_bytes += len(msg.value or b"")
+        self._m_in_flight_bytes.set(self._in_flight_bytes)
+        if lane_slots is self._priority_slots:
+            self._m_priority_records.inc()
+            self._m_priority_in_flight.inc()
+        task = asyncio.create_task(
+            self._process(tp, msg, partition_slots, lane_slots, job),
+            name=f"kafka-job-{tp.topic}-{tp.partition}-{msg.offset}",
+        )
+        self._tasks[task] = tp
+        task.add_done_callback(self._forget_task)
+        self._update_backpressure()
+        return True
+
+    async def _acquire_lane(self, tp: TopicPartition) -> asyncio.Semaphore:
+        if tp.topic == self._priority_topic:
+            await self._priority_slots.acquire()
+            return self._priority_slots
+
+        # While the normal lane is saturated keep serving the priority topic,
+        # so HIGH jobs never queue behind campaign traffic. Polls never block:
+        # the wait itself happens on the semaphore, so a freed slot is taken
+        # immediately instead of after the poll window.
+        wait = self._settings.consumer_batch_max_wait_ms / 1000
+        while (
+            self._in_flight.locked()
+            and not self._stopped.is_set()
+            and self._priority_partitions()
+        ):
+            if await self._poll_priority(timeout_ms=0):
+                continue
+            try:
+                await asyncio.wait_for(self._in_flight.acquire(), wait)
+            except asyncio.TimeoutError:
+                continue
+            return self._in_flight
+        await self._in_flight.acquire()
+        return self._in_flight
+
+    def _forget_task(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+
+    async def _process(
+        self,
+        tp: TopicPartition,
+        msg: ConsumerRecord,
+        partition_slots: asyncio.Semaphore,
+        lane_slots: asyncio.Semaphore,
+        job: NotificationJob | None = None,
+    ) -> None:
+        previous_attempts = 0
+        if msg.topic in self._retry_topics:
+            previous_attempts, _ = parse_retry_headers(msg.headers)
 
         try:
-            job = NotificationJob.model_validate(payload)
+            await self._handle_message(msg.value, previous_attempts, job=job)
+        except asyncio.CancelledError:
+            raise
         except Exception as exc:
-            logger.exception("Failed to validate NotificationJob payload: %s", exc)
-            await self._dlq.publish_raw(
-                raw_value, error_message="Invalid NotificationJob payload"
+            logger.exception(
+                "Fatal error while processing message %s:%d:%d",
+                tp.topic,
+                tp.partition,
+                msg.offset,
+            )
+            self._fatal_error = exc
+        else:
+            self._tracker.complete(tp, msg.offset)
+            if not self._batch_enabled:
+                self._commit_needed.set()
+        finally:
+            partition_slots.release()
+            lane_slots.release()
+            self._m_in_flight.dec()
+            if lane_slots is self._priority_slots:
+                self._m_priority_in_flight.dec()
+            self._in_flight_jobs -= 1
+            self._in_flight_bytes -= len(msg.value or b"")
+            self._m_in_flight_bytes.set(self._in_flight_bytes)
+            self._update_backpressure()
+
+    async def _commit_loop(self) -> None:
+        interval = self._settings.consumer_commit_interval_ms / 1000
+        while True:
+            await self._commit_needed.wait()
+            if interval > 0 and self._last_commit_at is not None:
+                remaining = interval - (time.monotonic() - self._last_commit_at)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+            self._commit_needed.clear()
+            await self._commit()
+
+    async def _commit(self) -> None:
+        if self._consumer is None:
+            return
+
+        assigned = self._consumer.assignment()
+        offsets = {
+            tp: offset
+            for tp, offset in self._tracker.commit_points().items()
+            if tp in assigned
+        }
+        if not offsets:
+            return
+
+        try:
+            await self._consumer.commit(offsets)
+        except Exception:
+            self._m_commit_failures.inc()
+            logger.exception("Failed to commit offsets %s", offsets)
+            return
+        self._tracker.mark_committed(offsets)
+
+        now = time.monotonic()
+        if self._last_commit_at is not None:
+            self._m_commit_interval.observe(now - self._last_commit_at)
+        self._last_commit_at = now
+        self._m_commits.inc()
+        self._m_commit_partitions.observe(len(offsets))
+
+    async def _drain_in_flight(self) -> None:
+        tasks = list(self._tasks)
+        if self._drain_deadline is None or not tasks:
+            return
+
+        timeout = max(0.0, self._drain_deadline - time.monotonic())
+        logger.info(
+            "Waiting up to %.1f sec for %s in-flight jobs to finish",
+            timeout,
+            len(tasks),
+        )
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(
+                "Drain deadline exceeded, %s in-flight jobs will be cancelled",
+                len(pending),
             )
+
+    async def _cancel_in_flight(self) -> None:
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+
+        logger.info("Cancelling %s in-flight jobs", len(tasks))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _on_partitions_revoked(self, revoked: set[TopicPartition]) -> None:
+        tasks = [task for task, tp in self._tasks.items() if tp in revoked]
+        if tasks:
+            logger.info(
+                "Waiting for %s in-flight jobs on revoked partitions %s",
+                len(tasks),
+                sorted(revoked),
+            )
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        await self._commit()
+        self._cancel_deferred(revoked)
+        self._tracker.forget(revoked)
+        for tp in revoked:
+            self._partition_slots.pop(tp, None)
+
+    async def _handle_message(
+        self,
+        raw_value: bytes,
+        previous_attempts: int = 0,
+        job: NotificationJob | None = None,
+    ) -> None:
+        try:
+            if job is None:
+                job = decode_job(raw_value)
+        except InvalidJobPayloadError as exc:
+            if exc.invalid_json:
+                logger.exception("Failed to decode message from Kafka: %s", exc)
+                error_message = "Invalid JSON in Kafka message"
+            else:
+                logger.exception("Failed to validate NotificationJob payload: %s", exc)
+                error_message = "Invalid NotificationJob payload"
+            await self._dlq.publish_raw(raw_value, error_message=error_message)
             return
 
         logger.info(
@@ -110,7 +620,7 @@ class KafkaNotificationConsumer:
         )
 
         try:
-            await self._processor.handle_job(job)
+            await self._processor.handle_job(job, previous_attempts)
         except Exception as exc:
             logger.exception(
                 "Unhandled error while handling job %s, sending to DLQ",
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from aiokafka.structs import TopicPartition
+
+
+class PartitionOffsets:
+    def __init__(self) -> None:
+        self._in_flight: set[int] = set()
+        self._next_offset: int | None = None
+        self._committed: int | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def start(self, offset: int) -> None:
+        self._in_flight.add(offset)
+        if self._committed is None:
+            self._committed = offset
+        if self._next_offset is None or offset >= self._next_offset:
+            self._next_offset = offset + 1
+
+    def complete(self, offset: int) -> None:
+        self._in_flight.discard(offset)
+
+    def committable(self) -> int | None:
+        if self._next_offset is None:
+            return None
+
+        offset = min(self._in_flight) if self._in_flight else self._next_offset
+        if self._committed is not None and offset <= self._committed:
+            return None
+        return offset
+
+    def mark_committed(self, offset: int) -> None:
+        if self._committed is None or offset > self._committed:
+            self._committed = offset
+
+
+class OffsetTracker:
+    def __init__(self) -> None:
+        self._partitions: dict[TopicPartition, PartitionOffsets] = {}
+
+    def start(self, tp: TopicPartition, offset: int) -> None:
+        self._partitions.setdefault(tp, PartitionOffsets()).start(offset)
+
+    def complete(self, tp: TopicPartition, offset: int) -> None:
+        partition = self._partitions.get(tp)
+        if partition is not None:
+            partition.complete(offset)
+
+    def in_flight(self, tp: TopicPartition | None = None) -> int:
+        if tp is not None:
+            partition = self._partitions.get(tp)
+            return partition.in_flight if partition else 0
+        return sum(p.in_flight for p in self._partitions.values())
+
+    def commit_points(self) -> dict[TopicPartition, int]:
+        points: dict[TopicPartition, int] = {}
+        for tp, partition in self._partitions.items():
+            offset = partition.committable()
+            if offset is not None:
+                points[tp] = offset
+        return points
+
+    def mark_committed(self, offsets: dict[TopicPartition, int]) -> None:
+        for tp, offset in offsets.items():
+            partition = self._partitions.get(tp)
+            if partition is not None:
+                partition.mark_committed(offset)
+
+    def forget(self, tps: Iterable[TopicPartition]) -> None:
+        for tp in tps:
+            self._partitions.pop(tp, None)
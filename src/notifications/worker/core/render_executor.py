@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import Any, Mapping, Sequence
+
+from notifications.common.config import Settings
+from notifications.common.exceptions import TemplateRenderLimitError
+from notifications.common.metrics import metrics
+from notifications.worker.core.template_renderer import (
+    render_html_template,
+    render_html_template_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+RENDER_EXECUTOR_MODES = ("none", "thread", "process")
+
+
+class RenderExecutor:
+    def __init__(self, settings: Settings) -> None:
+        mode = settings.render_executor
+        if mode not in RENDER_EXECUTOR_MODES:
+            raise ValueError(
+                f"Invalid RENDER_EXECUTOR={mode!r}. Expected one of "
+                f"{', '.join(RENDER_EXECUTOR_MODES)}."
+            )
+
+        self._mode = mode
+        self._timeout = settings.render_timeout_seconds
+        self._timeout_grace = settings.render_timeout_grace_seconds
+        self._max_size = settings.render_max_output_size
+        self._workers = settings.render_executor_workers
+        # Renders wait here rather than in the pool queue, so the wall-clock
+        # limit only covers time spent actually rendering.
+        self._slots = asyncio.Semaphore(self._workers)
+        self._warmup: list[Future] = []
+        self._executor: Executor | None = None
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix="render",
+            )
+        elif mode == "process":
+            self._executor = self._start_process_pool()
+
+        self._m_duration = metrics.histogram("template_render_seconds")
+        self._m_limit_errors = metrics.counter("template_render_limit_errors_total")
+
+    async def render(self, template_str: str, context: Mapping[str, Any]) -> str:
+        fn = partial(
+            render_html_template,
+            template_str,
+            dict(context),
+            timeout=self._timeout,
+            max_size=self._max_size,
+        )
+        return await self._run(fn, self._timeout)
+
+    async def render_batch(
+        self, template_str: str, contexts: Sequence[Mapping[str, Any]]
+    ) -> list[str | Exception]:
+        fn = partial(
+            render_html_template_batch,
+            template_str,
+            [dict(context) for context in contexts],
+            return_exceptions=True,
+            timeout=self._timeout,
+            max_size=self._max_size,
+        )
+        return await self._run(fn, self._timeout * len(contexts))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _start_process_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        # Spawn the workers up front; renders wait for them before the
+        # wall-clock limit starts, so interpreter startup never counts.
+        self._warmup = [
+            pool.submit(render_html_template, "", {}) for _ in range(self._workers)
+        ]
+        return pool
+
+    async def _run(self, fn, timeout: float):
+        # The CPU-time check inside the renderer only runs between output
+        # chunks, so it is best-effort; the wall-clock limit here is the
+        # backstop. Inline renders ("none") cannot be interrupted at all.
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if self._executor is None:
+                return fn()
+            async with self._slots:
+                if self._warmup:
+                    warmup = [asyncio.wrap_future(f) for f in self._warmup]
+                    await asyncio.gather(*warmup, return_exceptions=True)
+                future = loop.run_in_executor(self._executor, fn)
+                if timeout <= 0:
+                    return await future
+                try:
+                    return await asyncio.wait_for(future, timeout + self._timeout_grace)
+                except asyncio.TimeoutError:
+                    self._on_wall_timeout()
+                    raise TemplateRenderLimitError("wall_time", timeout) from None
+        except TemplateRenderLimitError:
+            self._m_limit_errors.inc()
+            raise
+        finally:
+            self._m_duration.observe(loop.time() - started)
+
+    def _on_wall_timeout(self) -> None:
+        if self._mode != "process":
+            # Threads cannot be killed; the render finishes in the background.
+            logger.warning("Template render exceeded its wall-clock limit")
+            return
+
+        logger.warning(
+            "Template render exceeded its wall-clock limit, recycling process pool"
+        )
+        pool = self._executor
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        self._executor = self._start_process_pool()
+        pool.shutdown(wait=False, cancel_futures=True)
+        # shutdown() alone would let the runaway render run to completion.
+        for process in processes:
+            process.terminate()
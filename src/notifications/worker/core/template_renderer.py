@@ -1,14 +1,257 @@
-from jinja2 import Environment, select_autoescape
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, Sequence
 
-env = Environment(
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    Template,
+    TemplateNotFound,
+    meta,
+    nodes,
+    select_autoescape,
+)
+from jinja2.sandbox import SandboxedEnvironment
+
+from notifications.common.exceptions import TemplateRenderLimitError
+from notifications.common.metrics import metrics
+from notifications.worker.core.config import settings
+
+
+def template_name(template_code: str, locale: str, channel: str) -> str:
+    return f"{template_code}/{locale}/{channel}"
+
+
+class DatabaseLoader(BaseLoader):
+    # Jinja loaders are synchronous, so this serves template bodies that the
+    # worker already fetched through TemplateRepository (see JobProcessor and
+    # the startup warm-up) under template_name() keys, e.g. for {% include %}.
+    def __init__(self) -> None:
+        self._sources: dict[str, str] = {}
+
+    def put(self, name: str, source: str) -> None:
+        self._sources[name] = source
+
+    def discard(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def get_source(self, environment: Environment, template: str):
+        source = self._sources.get(template)
+        if source is None:
+            raise TemplateNotFound(template)
+        return source, None, lambda: self._sources.get(template) == source
+
+    def list_templates(self) -> list[str]:
+        return sorted(self._sources)
+
+
+def _make_bytecode_cache(directory: str) -> BytecodeCache | None:
+    if not directory:
+        return None
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(directory, pattern="notifications-%s.cache")
+
+
+template_loader = DatabaseLoader()
+
+_environment_class = (
+    SandboxedEnvironment if settings.template_sandbox_enabled else Environment
+)
+
+env = _environment_class(
+    loader=template_loader,
+    bytecode_cache=_make_bytecode_cache(settings.template_bytecode_cache_dir),
     autoescape=select_autoescape(default_for_string=True, default=True),
     enable_async=False,
 )
 
 
-def render_html_template(template_str: str, context: dict) -> str:
-    template = env.from_string(template_str)
-    return template.render(**context)
+class CompiledTemplateCache:
+    def __init__(self, environment: Environment, maxsize: int) -> None:
+        self._env = environment
+        self._maxsize = maxsize
+        self._templates: OrderedDict[str, Template] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._m_hits = metrics.counter("template_cache_hits_total")
+        self._m_misses = metrics.counter("template_cache_misses_total")
+        self._m_evictions = metrics.counter("template_cache_evictions_total")
+        self._m_size = metrics.gauge("template_cache_size")
+        self._m_bytecode_hits = metrics.counter("template_bytecode_cache_hits_total")
+        self._m_bytecode_misses = metrics.counter(
+            "template_bytecode_cache_misses_total"
+        )
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, source: str) -> Template:
+        with self._lock:
+            template = self._templates.get(source)
+            if template is not None:
+                self._templates.move_to_end(source)
+                self._m_hits.inc()
+                return template
+
+        self._m_misses.inc()
+        template = self._compile(source)
+        if self._maxsize <= 0:
+            return template
+
+        with self._lock:
+            self._templates[source] = template
+            while len(self._templates) > self._maxsize:
+                self._templates.popitem(last=False)
+                self._m_evictions.inc()
+            self._m_size.set(len(self._templates))
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self._m_size.set(0)
+
+    def _compile(self, source: str) -> Template:
+        bcc = self._env.bytecode_cache
+        if bcc is None:
+            return self._env.from_string(source)
+
+        # from_string() bypasses the bytecode cache, so go through the bucket
+        # API ourselves, naming each bucket after the source's content hash.
+        name = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        bucket = bcc.get_bucket(self._env, name, None, source)
+        code = bucket.code
+        if code is None:
+            self._m_bytecode_misses.inc()
+            code = self._env.compile(source)
+            bucket.code = code
+            bcc.set_bucket(bucket)
+        else:
+            self._m_bytecode_hits.inc()
+
+        return self._env.template_class.from_code(
+            self._env, code, self._env.make_globals(None)
+        )
+
+
+template_cache = CompiledTemplateCache(env, settings.template_cache_size)
+
+
+def _collect(chunks: Iterator[str], timeout: float, max_size: int) -> str:
+    # Limits are checked between output chunks, using the CPU time of the
+    # rendering thread, so a runaway loop is stopped without killing it.
+    # This is best-effort: a loop that emits nothing is only caught by the
+    # executor's wall-clock limit.
+    if timeout <= 0 and max_size <= 0:
+        return env.concat(chunks)
+
+    deadline = time.thread_time() + timeout if timeout > 0 else None
+    size = 0
+    parts: list[str] = []
+    for chunk in chunks:
+        size += len(chunk)
+        if max_size > 0 and size > max_size:
+            raise TemplateRenderLimitError("output_size", max_size)
+        if deadline is not None and time.thread_time() > deadline:
+            raise TemplateRenderLimitError("cpu_time", timeout)
+        parts.append(chunk)
+    return env.concat(parts)
+
+
+def render_html_template(
+    template_str: str,
+    context: dict,
+    *,
+    timeout: float = 0.0,
+    max_size: int = 0,
+) -> str:
+    template = template_cache.get(template_str)
+    return _collect(template.generate(**context), timeout, max_size)
+
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=256)
+def _template_dependencies(
+    template_str: str,
+) -> tuple[frozenset[str], dict[str, frozenset[str]]]:
+    ast = env.parse(template_str)
+    blocks: dict[str, frozenset[str]] = {}
+    for block in ast.find_all(nodes.Block):
+        body = nodes.Template(block.body, lineno=block.lineno)
+        body.set_environment(env)
+        blocks[block.name] = frozenset(meta.find_undeclared_variables(body))
+    return frozenset(meta.find_undeclared_variables(ast)), blocks
+
+
+def _shared_keys(contexts: Sequence[Mapping[str, Any]]) -> set[str]:
+    first, rest = contexts[0], contexts[1:]
+    return {
+        key
+        for key, value in first.items()
+        if all(ctx.get(key, _MISSING) == value for ctx in rest)
+    }
+
+
+def _constant_block(rendered: str) -> Callable[[Any], Iterator[str]]:
+    def render_block(context: Any) -> Iterator[str]:
+        yield rendered
+
+    return render_block
+
+
+def render_html_template_batch(
+    template_str: str,
+    contexts: Sequence[Mapping[str, Any]],
+    *,
+    return_exceptions: bool = False,
+    timeout: float = 0.0,
+    max_size: int = 0,
+) -> list[str | Exception]:
+    # Blocks (or the whole template) that only reference variables with the
+    # same value in every context are rendered once and reused.
+    if not contexts:
+        return []
+
+    template = template_cache.get(template_str)
+    variables, block_variables = _template_dependencies(template_str)
+    shared = _shared_keys(contexts)
+
+    if variables <= shared:
+        try:
+            rendered = _collect(template.generate(**contexts[0]), timeout, max_size)
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            return [exc] * len(contexts)
+        return [rendered] * len(contexts)
+
+    memoized = [name for name, names in block_variables.items() if names <= shared]
+    rendered_blocks: dict[str, Callable[[Any], Iterator[str]]] = {}
+
+    results: list[str | Exception] = []
+    for context in contexts:
+        try:
+            ctx = template.new_context(dict(context))
+            for name in memoized:
+                if name not in rendered_blocks:
+                    rendered_blocks[name] = _constant_block(
+                        _collect(template.blocks[name](ctx), timeout, max_size)
+                    )
+                ctx.blocks[name] = [rendered_blocks[name]]
+            results.append(_collect(template.root_render_func(ctx), timeout, max_size))
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            results.append(exc)
+    return results
 
 
 def render_text_template(template_str: str, context: dict) -> str:
@@ -0,0 +1,3 @@
+from notifications.worker.delayed.dispatcher import DelayedJobDispatcher
+
+__all__ = ["DelayedJobDispatcher"]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from aiokafka import AIOKafkaProducer
+
+from notifications.common.codec import decode_job
+from notifications.common.config import Settings
+from notifications.common.exceptions import InvalidJobPayloadError
+from notifications.common.metrics import metrics
+from notifications.common.schemas import NotificationJob
+from notifications.worker.repositories import ScheduledJob, ScheduledJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+class DelayedJobDispatcher:
+    def __init__(
+        self,
+        settings: Settings,
+        repo: ScheduledJobRepository,
+        producer: AIOKafkaProducer,
+    ) -> None:
+        self._settings = settings
+        self._repo = repo
+        self._producer = producer
+        self._wakeup = asyncio.Event()
+        self._next_due_at: datetime | None = None
+
+        self._m_parked = metrics.counter("delayed_jobs_parked_total")
+        self._m_dispatched = metrics.counter("delayed_jobs_dispatched_total")
+        self._m_lag = metrics.histogram("delayed_jobs_dispatch_lag_seconds")
+
+    async def park(self, job: NotificationJob) -> None:
+        due_at = job.send_after.astimezone(timezone.utc)
+        await self._repo.park(job, due_at)
+        self._m_parked.inc()
+
+        if self._next_due_at is None or due_at < self._next_due_at:
+            self._next_due_at = due_at
+            self._wakeup.set()
+
+        logger.info("Job %s parked until %s", job.job_id, due_at)
+
+    async def run(self) -> None:
+        batch_size = self._settings.delayed_jobs_dispatch_batch_size
+        logger.info(
+            "Delayed job dispatcher started: poll_interval=%s batch_size=%s",
+            self._settings.delayed_jobs_poll_interval_seconds,
+            batch_size,
+        )
+
+        while True:
+            self._wakeup.clear()
+            try:
+                dispatched = await self._repo.dispatch_due(batch_size, self._publish)
+                if dispatched >= batch_size:
+                    continue
+                self._next_due_at = await self._repo.next_due_at()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to dispatch delayed jobs")
+                self._next_due_at = None
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._sleep_time())
+            except asyncio.TimeoutError:
+                pass
+
+    def _sleep_time(self) -> float:
+        poll_interval = self._settings.delayed_jobs_poll_interval_seconds
+        if self._next_due_at is None:
+            return poll_interval
+
+        now = datetime.now(timezone.utc)
+        until_due = (self._next_due_at - now).total_seconds()
+        return max(0.0, min(poll_interval, until_due))
+
+    def _topic_for(self, job: ScheduledJob) -> str:
+        if not self._settings.priority_lanes_enabled:
+            return self._settings.kafka_outbox_topic
+        try:
+            priority = decode_job(job.payload).meta.priority
+        except InvalidJobPayloadError:
+            return self._settings.kafka_outbox_topic
+        return self._settings.outbox_topic_for(priority)
+
+    async def _publish(self, jobs: list[ScheduledJob]) -> None:
+        futures = [
+            await self._producer.send(
+                self._topic_for(job),
+                key=str(job.job_id).encode("utf-8"),
+                value=job.payload.encode("utf-8"),
+            )
+            for job in jobs
+        ]
+        await asyncio.gather(*futures)
+
+        now = datetime.now(timezone.utc)
+        for job in jobs:
+            self._m_lag.observe((now - job.due_at).total_seconds())
+        self._m_dispatched.inc(len(jobs))
+        logger.info("Re-injected %s due delayed jobs", len(jobs))
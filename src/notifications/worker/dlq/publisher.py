@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
 from aiokafka import AIOKafkaProducer
 
+from notifications.common.codec import encode_json
 from notifications.common.schemas import NotificationJob
 from notifications.common.config import Settings
 
@@ -37,7 +37,7 @@ class DlqPublisher:
         await self._send(payload, key=None)
 
     async def _send(self, payload: dict[str, Any], key: str | None) -> None:
-        value = json.dumps(payload).encode("utf-8")
+        value = encode_json(payload)
         key_bytes = key.encode("utf-8") if key else None
 
         logger.error(
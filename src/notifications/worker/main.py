@@ -1,32 +1,48 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 import logging
 import signal
+from pathlib import Path
 
-from notifications.common.health_files import mark_ready, clear_ready, heartbeat_loop
+from notifications.common.health_files import (
+    mark_ready,
+    clear_ready,
+    heartbeat_loop,
+    use_instance_paths,
+)
+from notifications.common.metrics import metrics_dump_loop
 from notifications.worker.auth import AuthClient
 from notifications.worker.consumer import KafkaNotificationConsumer
 from notifications.worker.core.config import settings
 from notifications.worker.core.logger import configure_logging
+from notifications.worker.core.render_executor import RenderExecutor
+from notifications.worker.delayed import DelayedJobDispatcher
 from notifications.worker.dlq import DlqPublisher
 from notifications.worker.processor import JobProcessor
 from notifications.worker.repositories import (
+    DeliveryPartitionManager,
+    DeliveryStatusBuffer,
     NotificationDeliveryRepository,
+    ScheduledJobRepository,
     TemplateRepository,
 )
+from notifications.worker.retry import RetryPublisher
 from notifications.worker.senders import EmailSender, PushSender, WsSender
 from notifications.worker.startup import (
     create_db_pool,
     create_kafka_producer,
     create_http_client,
+    warm_up_templates,
 )
+from notifications.worker.supervisor import WorkerSupervisor
 
 
 logger = logging.getLogger(__name__)
 
 
-async def app() -> None:
+async def app(instance: str | None = None) -> None:
     try:
         _ = settings.retry_delays_seconds
     except ValueError:
@@ -40,17 +56,52 @@ async def app() -> None:
         settings.kafka_outbox_topic,
         settings.kafka_dlq_topic,
     )
+    metrics_path = Path(settings.metrics_path)
+    if instance is not None:
+        use_instance_paths(instance)
+        metrics_path = metrics_path.with_name(
+            f"{metrics_path.stem}.{instance}{metrics_path.suffix}"
+        )
     clear_ready()
 
     db_pool = await create_db_pool()
     dlq_producer = await create_kafka_producer()
     http_client = await create_http_client()
 
-    mark_ready()
     hb_task = asyncio.create_task(heartbeat_loop(5.0), name="worker-heartbeat")
+    metrics_task = asyncio.create_task(
+        metrics_dump_loop(metrics_path, settings.metrics_dump_interval_seconds),
+        name="worker-metrics",
+    )
+
+    template_repo = TemplateRepository(
+        db_pool,
+        cache_ttl_seconds=settings.template_repo_cache_ttl_seconds,
+        negative_ttl_seconds=settings.template_repo_negative_ttl_seconds,
+    )
+    template_listener_task = asyncio.create_task(
+        template_repo.listen_for_invalidations(
+            settings.db_asyncpg_dsn, settings.template_notify_channel
+        ),
+        name="template-listener",
+    )
+    if settings.template_warmup_enabled:
+        try:
+            await warm_up_templates(template_repo)
+        except Exception:
+            logger.exception("Template warm-up failed, starting with a cold cache")
+    mark_ready()
 
-    template_repo = TemplateRepository(db_pool)
     delivery_repo = NotificationDeliveryRepository(db_pool)
+    status_buffer = (
+        DeliveryStatusBuffer(
+            delivery_repo,
+            flush_interval_seconds=settings.delivery_flush_interval_ms / 1000,
+            max_batch_size=settings.delivery_flush_max_batch,
+        )
+        if settings.delivery_write_behind_enabled
+        else None
+    )
     auth_client = AuthClient(settings, http_client)
     email_sender = EmailSender(
         host=settings.smtp_host, port=settings.smtp_port, sender=settings.smtp_from
@@ -58,16 +109,31 @@ async def app() -> None:
     push_sender = PushSender()
     ws_sender = WsSender()
     dlq_publisher = DlqPublisher(settings, dlq_producer)
+    retry_publisher = (
+        RetryPublisher(settings, dlq_producer)
+        if settings.kafka_retry_topics_enabled
+        else None
+    )
+    delayed_dispatcher = (
+        DelayedJobDispatcher(settings, ScheduledJobRepository(db_pool), dlq_producer)
+        if settings.delayed_jobs_enabled
+        else None
+    )
+
+    render_executor = RenderExecutor(settings)
 
     processor = JobProcessor(
         settings=settings,
         template_repo=template_repo,
-        delivery_repo=delivery_repo,
+        delivery_repo=status_buffer or delivery_repo,
         auth_client=auth_client,
         email_sender=email_sender,
         push_sender=push_sender,
         ws_sender=ws_sender,
         dlq_publisher=dlq_publisher,
+        retry_publisher=retry_publisher,
+        delayed_dispatcher=delayed_dispatcher,
+        render_executor=render_executor,
     )
 
     consumer = KafkaNotificationConsumer(
@@ -91,18 +157,51 @@ async def app() -> None:
 
     logger.info("Starting Kafka consumer task...")
     consumer_task = asyncio.create_task(consumer.start(), name="kafka-consumer")
+    dispatcher_task = (
+        asyncio.create_task(delayed_dispatcher.run(), name="delayed-dispatcher")
+        if delayed_dispatcher is not None
+        else None
+    )
+
+    partitions_task = None
+    if settings.delivery_partition_maintenance_enabled:
+        partition_manager = DeliveryPartitionManager(
+            db_pool,
+            months_ahead=settings.delivery_partition_months_ahead,
+            retention_months=settings.delivery_retention_months,
+        )
+        partitions_task = asyncio.create_task(
+            partition_manager.run(
+                settings.delivery_partition_maintenance_interval_seconds
+            ),
+            name="delivery-partitions",
+        )
 
     try:
         logger.info("Worker is running, waiting for stop event...")
         await stop_event.wait()
-        logger.info("Stop event set, cancelling consumer task...")
-        consumer_task.cancel()
+        logger.info("Stop event set, draining consumer...")
+        await consumer.drain(settings.shutdown_drain_timeout_seconds)
+        if not consumer_task.done():
+            consumer_task.cancel()
         try:
             await consumer_task
         except asyncio.CancelledError:
             logger.info("Consumer task cancelled")
     finally:
+        if dispatcher_task is not None:
+            dispatcher_task.cancel()
+            await asyncio.gather(dispatcher_task, return_exceptions=True)
+        template_listener_task.cancel()
+        await asyncio.gather(template_listener_task, return_exceptions=True)
+        if partitions_task is not None:
+            partitions_task.cancel()
+            await asyncio.gather(partitions_task, return_exceptions=True)
+        if status_buffer is not None:
+            await status_buffer.close()
+        render_executor.shutdown()
         hb_task.cancel()
+        metrics_task.cancel()
         clear_ready()
         await http_client.aclose()
         logger.info("HTTP client closed")
@@ -112,10 +211,33 @@ async def app() -> None:
         logger.info("Postgres pool closed")
 
 
-def main() -> None:
+def run_worker_process(instance: str) -> None:
+    configure_logging()
+    logger.info("Notification worker process %s starting", instance)
+    asyncio.run(app(instance))
+    logger.info("Notification worker process %s exited", instance)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="notifications.worker.main")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.worker_processes,
+        help="number of consumer processes to run in the same consumer group",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     configure_logging()
     logger.info("Notification worker main() starting")
-    asyncio.run(app())
+    if args.processes > 1:
+        supervisor = WorkerSupervisor(settings, args.processes, run_worker_process)
+        asyncio.run(supervisor.run())
+    else:
+        asyncio.run(app())
     logger.info("Notification worker main() exited")
 
 
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Mapping
+
+from notifications.common.exceptions import ChannelBulkheadFullError
+from notifications.common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelBulkhead:
+    def __init__(self, channel: str, concurrency: int, queue_depth: int) -> None:
+        self.channel = channel
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self._slots = asyncio.Semaphore(concurrency)
+        self._active = 0
+        self._waiting = 0
+
+        labels = {"channel": channel}
+        self._m_active = metrics.gauge("channel_bulkhead_active", labels)
+        self._m_waiting = metrics.gauge("channel_bulkhead_queued", labels)
+        self._m_rejected = metrics.counter("channel_bulkhead_rejected_total", labels)
+        metrics.gauge("channel_bulkhead_concurrency", labels).set(concurrency)
+        metrics.gauge("channel_bulkhead_queue_depth", labels).set(queue_depth)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._slots.locked() and self._waiting >= self.queue_depth:
+            self._m_rejected.inc()
+            raise ChannelBulkheadFullError(self.channel, self.queue_depth)
+
+        self._waiting += 1
+        self._m_waiting.set(self._waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            self._m_waiting.set(self._waiting)
+
+        self._active += 1
+        self._m_active.set(self._active)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._m_active.set(self._active)
+            self._slots.release()
+
+
+class ChannelBulkheads:
+    def __init__(
+        self, concurrency: Mapping[str, int], queue_depth: Mapping[str, int]
+    ) -> None:
+        self._bulkheads = {
+            channel: ChannelBulkhead(channel, limit, queue_depth.get(channel, limit))
+            for channel, limit in concurrency.items()
+        }
+        if self._bulkheads:
+            logger.info(
+                "Channel bulkheads: %s",
+                {
+                    name: (b.concurrency, b.queue_depth)
+                    for name, b in self._bulkheads.items()
+                },
+            )
+
+    def get(self, channel: str) -> ChannelBulkhead | None:
+        return self._bulkheads.get(channel)
+
+    @asynccontextmanager
+    async def slot(self, channel: str) -> AsyncIterator[None]:
+        bulkhead = self._bulkheads.get(channel)
+        if bulkhead is None:
+            yield
+            return
+        async with bulkhead.slot():
+            yield
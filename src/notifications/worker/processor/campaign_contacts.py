@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Iterable
+from uuid import UUID
+
+from notifications.common.metrics import metrics
+from notifications.worker.auth import UserContacts
+
+
+class CampaignContactStore:
+    """Contacts prefetched for a campaign, handed out once per job."""
+
+    def __init__(self, ttl_seconds: float, max_campaigns: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_campaigns = max_campaigns
+        self._campaigns: OrderedDict[UUID, tuple[float, dict[UUID, UserContacts]]] = (
+            OrderedDict()
+        )
+
+        self._m_hits = metrics.counter("campaign_contacts_hits_total")
+        self._m_misses = metrics.counter("campaign_contacts_misses_total")
+        self._m_prefetched = metrics.counter("campaign_contacts_prefetched_total")
+
+    def missing(self, campaign_id: UUID, user_ids: Iterable[UUID]) -> list[UUID]:
+        contacts = self._live(campaign_id)
+        known = contacts if contacts is not None else {}
+        return [user_id for user_id in dict.fromkeys(user_ids) if user_id not in known]
+
+    def put(self, campaign_id: UUID, contacts: dict[UUID, UserContacts]) -> None:
+        self._evict_expired()
+        current = self._live(campaign_id) or {}
+        current.update(contacts)
+        self._campaigns[campaign_id] = (time.monotonic() + self._ttl, current)
+        self._campaigns.move_to_end(campaign_id)
+        while len(self._campaigns) > self._max_campaigns:
+            self._campaigns.popitem(last=False)
+        self._m_prefetched.inc(len(contacts))
+
+    def pop(self, campaign_id: UUID, user_id: UUID) -> UserContacts | None:
+        # Taken contacts are not kept: a retried job looks its user up again.
+        contacts = self._live(campaign_id)
+        found = contacts.pop(user_id, None) if contacts is not None else None
+        if found is None:
+            self._m_misses.inc()
+        else:
+            self._m_hits.inc()
+        return found
+
+    def _live(self, campaign_id: UUID) -> dict[UUID, UserContacts] | None:
+        entry = self._campaigns.get(campaign_id)
+        if entry is None:
+            return None
+        expires_at, contacts = entry
+        if expires_at <= time.monotonic():
+            del self._campaigns[campaign_id]
+            return None
+        return contacts
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [cid for cid, (exp, _) in self._campaigns.items() if exp <= now]
+        for campaign_id in expired:
+            del self._campaigns[campaign_id]
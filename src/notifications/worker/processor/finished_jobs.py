@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from notifications.common.metrics import metrics
+from notifications.common.schemas import NotificationStatus
+from notifications.worker.repositories import (
+    NotificationDelivery,
+    NotificationDeliveryRepository,
+)
+
+
+class FinishedJobs:
+    """LRU of jobs this worker has taken to a final status.
+
+    Redeliveries of those jobs are skipped without a trip to Postgres.
+    """
+
+    def __init__(self, maxsize: int, max_attempts: int) -> None:
+        self._maxsize = maxsize
+        self._max_attempts = max_attempts
+        self._entries: OrderedDict[UUID, NotificationDelivery] = OrderedDict()
+
+        self._m_hits = metrics.counter("finished_jobs_cache_hits_total")
+
+    def get(self, job_id: UUID) -> NotificationDelivery | None:
+        delivery = self._entries.get(job_id)
+        if delivery is not None:
+            self._entries.move_to_end(job_id)
+            self._m_hits.inc()
+        return delivery
+
+    def remember(self, delivery: NotificationDelivery) -> None:
+        if not self._is_final(delivery):
+            self._entries.pop(delivery.job_id, None)
+            return
+        self._entries[delivery.job_id] = delivery
+        self._entries.move_to_end(delivery.job_id)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _is_final(self, delivery: NotificationDelivery) -> bool:
+        if delivery.status == NotificationStatus.SENT.value:
+            return True
+        return (
+            delivery.status
+            in (NotificationStatus.EXPIRED.value, NotificationStatus.FAILED.value)
+            and delivery.attempts >= self._max_attempts
+        )
+
+
+class FinishedJobsRecorder:
+    """Delivery repository front that feeds saved statuses into FinishedJobs."""
+
+    def __init__(
+        self, repo: NotificationDeliveryRepository, finished: FinishedJobs
+    ) -> None:
+        self._repo = repo
+        self._finished = finished
+
+    async def get_by_job_id(self, job_id: UUID) -> Optional[NotificationDelivery]:
+        return await self._repo.get_by_job_id(job_id)
+
+    async def claim(
+        self, *, job_id: UUID, user_id: UUID, channel: str, created_at: datetime
+    ) -> Optional[NotificationDelivery]:
+        return await self._repo.claim(
+            job_id=job_id, user_id=user_id, channel=channel, created_at=created_at
+        )
+
+    async def save_status(
+        self,
+        *,
+        job_id: UUID,
+        user_id: UUID,
+        channel: str,
+        status: str,
+        attempts: int,
+        error_code: Optional[str],
+        error_message: Optional[str],
+        sent_at: Optional[datetime],
+        created_at: datetime,
+    ) -> None:
+        await self._repo.save_status(
+            job_id=job_id,
+            user_id=user_id,
+            channel=channel,
+            status=status,
+            attempts=attempts,
+            error_code=error_code,
+            error_message=error_message,
+            sent_at=sent_at,
+            created_at=created_at,
+        )
+        self._finished.remember(
+            NotificationDelivery(
+                job_id=job_id,
+                user_id=user_id,
+                status=status,
+                attempts=attempts,
+                sent_at=sent_at,
+            )
+        )
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import defaultdict
+from typing import Iterable
+from uuid import UUID
 
 from jinja2 import UndefinedError
+from jinja2.exceptions import SecurityError
 
 from notifications.common.config import Settings
+from notifications.common.exceptions import TemplateRenderError
 from notifications.common.schemas import (
     NotificationChannel,
     NotificationJob,
@@ -12,18 +18,32 @@ from notifications.common.schemas import (
 )
 
 from notifications.worker.auth import AuthClient
+from notifications.worker.delayed import DelayedJobDispatcher
 from notifications.worker.dlq import DlqPublisher
 from notifications.worker.repositories import (
     NotificationDeliveryRepository,
     TemplateRepository,
 )
+from notifications.worker.retry import RetryPublisher
 from notifications.worker.senders import EmailSender, PushSender, WsSender
+from notifications.worker.processor.bulkhead import ChannelBulkheads
+from notifications.worker.processor.campaign_contacts import CampaignContactStore
+from notifications.worker.processor.finished_jobs import (
+    FinishedJobs,
+    FinishedJobsRecorder,
+)
 from notifications.worker.processor.retry_engine import attempt_with_retries
+from notifications.worker.processor.status_writer import _ensure_channel
 from notifications.worker.processor.timing import (
     handle_expiration_if_needed,
+    send_after_delay_seconds,
     wait_send_after_if_needed,
 )
-from notifications.worker.core.template_renderer import render_html_template
+from notifications.worker.core.render_executor import RenderExecutor
+from notifications.worker.core.template_renderer import (
+    template_loader,
+    template_name,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,23 +59,123 @@ class JobProcessor:
         push_sender: PushSender,
         ws_sender: WsSender,
         dlq_publisher: DlqPublisher,
+        retry_publisher: RetryPublisher | None = None,
+        delayed_dispatcher: DelayedJobDispatcher | None = None,
+        render_executor: RenderExecutor | None = None,
     ) -> None:
         self.settings = settings
         self.template_repo = template_repo
         self.delivery_repo = delivery_repo
+        self._finished = None
+        if settings.finished_jobs_cache_size > 0:
+            self._finished = FinishedJobs(
+                settings.finished_jobs_cache_size, settings.max_attempts
+            )
+            self.delivery_repo = FinishedJobsRecorder(delivery_repo, self._finished)
         self.auth_client = auth_client
         self.email_sender = email_sender
         self.push_sender = push_sender
         self.ws_sender = ws_sender
         self.dlq = dlq_publisher
+        self.retry_publisher = retry_publisher
+        self.delayed_dispatcher = delayed_dispatcher
+        self.render_executor = render_executor or RenderExecutor(settings)
 
         self._senders = {
             NotificationChannel.EMAIL: email_sender,
             NotificationChannel.PUSH: push_sender,
             NotificationChannel.WS: ws_sender,
         }
+        self._bulkheads = ChannelBulkheads(
+            settings.channel_concurrency, settings.channel_queue_depth
+        )
+        self._prerendered: dict[UUID, tuple[str, str]] = {}
+        self._campaign_contacts = (
+            CampaignContactStore(
+                ttl_seconds=settings.campaign_contacts_ttl_seconds,
+                max_campaigns=settings.campaign_contacts_max_campaigns,
+            )
+            if settings.campaign_prefetch_enabled
+            else None
+        )
+
+    async def prepare_batch(self, jobs: list[NotificationJob]) -> None:
+        await asyncio.gather(self._prerender(jobs), self._prefetch_contacts(jobs))
+
+    async def _prefetch_contacts(self, jobs: list[NotificationJob]) -> None:
+        if self._campaign_contacts is None:
+            return
+
+        segments: dict[UUID, list[UUID]] = defaultdict(list)
+        for job in jobs:
+            if job.meta.campaign_id is not None:
+                segments[job.meta.campaign_id].append(job.user_id)
+
+        for campaign_id, user_ids in segments.items():
+            if len(user_ids) < 2:
+                continue
+            missing = self._campaign_contacts.missing(campaign_id, user_ids)
+            if not missing:
+                continue
+            contacts = await self.auth_client.get_many_user_contacts(missing)
+            self._campaign_contacts.put(campaign_id, contacts)
+            logger.debug(
+                "Prefetched %s contacts for campaign %s", len(contacts), campaign_id
+            )
+
+    async def _prerender(self, jobs: list[NotificationJob]) -> None:
+        groups: dict[tuple[str, str, str], list[NotificationJob]] = defaultdict(list)
+        for job in jobs:
+            if job.meta.campaign_id is None:
+                continue
+            channel_str = self._normalize_channel(job.channel)
+            groups[(job.template_code, job.locale, channel_str)].append(job)
+
+        for (template_code, locale, channel_str), group in groups.items():
+            if len(group) < 2:
+                continue
+            template = await self.template_repo.get_template(
+                template_code=template_code, locale=locale, channel=channel_str
+            )
+            if not template:
+                continue
+            template_loader.put(
+                template_name(template_code, locale, channel_str), template.body or ""
+            )
+
+            contexts = [job.data for job in group]
+            subjects = await self.render_executor.render_batch(
+                template.subject or "", contexts
+            )
+            bodies = await self.render_executor.render_batch(
+                template.body or "", contexts
+            )
+            for job, subject, body in zip(group, subjects, bodies):
+                if isinstance(subject, Exception) or isinstance(body, Exception):
+                    continue
+                self._prerendered[job.job_id] = (subject, body)
+
+            logger.debug(
+                "Pre-rendered %s jobs for template code=%s locale=%s channel=%s",
+                len(group),
+                template_code,
+                locale,
+                channel_str,
+            )
+
+    def discard_prerendered(self, job_ids: Iterable[UUID]) -> None:
+        for job_id in job_ids:
+            self._prerendered.pop(job_id, None)
 
-    async def handle_job(self, job: NotificationJob) -> None:
+    async def handle_job(
+        self, job: NotificationJob, previous_attempts: int = 0
+    ) -> None:
+        try:
+            await self._handle_job(job, previous_attempts)
+        finally:
+            self._prerendered.pop(job.job_id, None)
+
+    async def _handle_job(self, job: NotificationJob, previous_attempts: int) -> None:
         existing = await self._get_existing(job)
         if self._should_skip(existing):
             return
@@ -68,12 +188,16 @@ class JobProcessor:
         if expired:
             return
 
+        if self._should_park(job):
+            await self.delayed_dispatcher.park(job)
+            return
+
         await wait_send_after_if_needed(
             job=job,
             max_send_delay_seconds=self.settings.max_send_delay_seconds,
         )
 
-        existing_attempts = existing.attempts if existing else 0
+        existing_attempts = max(existing.attempts if existing else 0, previous_attempts)
         await attempt_with_retries(
             job=job,
             existing_attempts=existing_attempts,
@@ -82,10 +206,26 @@ class JobProcessor:
             attempt_send_fn=self._attempt_send,
             delivery_repo=self.delivery_repo,
             dlq_publisher=self.dlq,
+            retry_publisher=self.retry_publisher,
         )
 
     async def _get_existing(self, job: NotificationJob):
-        return await self.delivery_repo.get_by_job_id(job.job_id)
+        if self._finished is not None:
+            finished = self._finished.get(job.job_id)
+            if finished is not None:
+                return finished
+        return await self.delivery_repo.claim(
+            job_id=job.job_id,
+            user_id=job.user_id,
+            channel=_ensure_channel(job),
+            created_at=job.created_at,
+        )
+
+    def _should_park(self, job: NotificationJob) -> bool:
+        if self.delayed_dispatcher is None:
+            return False
+        delay = send_after_delay_seconds(job)
+        return delay >= self.settings.delayed_jobs_min_delay_seconds
 
     def _should_skip(self, existing) -> bool:
         if not existing:
@@ -117,9 +257,31 @@ class JobProcessor:
         return str(channel)
 
     async def _attempt_send(self, job: NotificationJob) -> None:
-        contacts = await self.auth_client.get_user_contacts(job.user_id)
+        contacts = await self._get_contacts(job)
 
         channel_str = self._normalize_channel(job.channel)
+        prerendered = self._prerendered.pop(job.job_id, None)
+        if prerendered is not None:
+            subject, body = prerendered
+        else:
+            subject, body = await self._render(job, channel_str)
+
+        sender = self._senders.get(job.channel)
+        if sender is None:
+            raise RuntimeError(f"Unsupported channel: {job.channel}")
+
+        async with self._bulkheads.slot(channel_str):
+            await sender.send(job=job, contacts=contacts, subject=subject, body=body)
+
+    async def _get_contacts(self, job: NotificationJob):
+        campaign_id = job.meta.campaign_id
+        if self._campaign_contacts is not None and campaign_id is not None:
+            contacts = self._campaign_contacts.pop(campaign_id, job.user_id)
+            if contacts is not None:
+                return contacts
+        return await self.auth_client.get_user_contacts(job.user_id)
+
+    async def _render(self, job: NotificationJob, channel_str: str) -> tuple[str, str]:
         template = await self.template_repo.get_template(
             template_code=job.template_code,
             locale=job.locale,
@@ -133,15 +295,15 @@ class JobProcessor:
 
         subject_template = template.subject or ""
         body_template = template.body or ""
+        template_loader.put(
+            template_name(job.template_code, job.locale, channel_str), body_template
+        )
 
         try:
-            subject = render_html_template(subject_template, job.data)
-            body = render_html_template(body_template, job.data)
+            subject = await self.render_executor.render(subject_template, job.data)
+            body = await self.render_executor.render(body_template, job.data)
         except UndefinedError as e:
             raise RuntimeError(f"Missing variable in template: {e}") from e
-
-        sender = self._senders.get(job.channel)
-        if sender is None:
-            raise RuntimeError(f"Unsupported channel: {job.channel}")
-
-        await sender.send(job=job, contacts=contacts, subject=subject, body=body)
+        except SecurityError as e:
+            raise TemplateRenderError(f"Unsafe template operation: {e}") from e
+        return subject, body
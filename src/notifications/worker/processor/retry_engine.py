@@ -4,9 +4,11 @@ import asyncio
 import logging
 from typing import Awaitable, Callable, Sequence
 
+from notifications.common.exceptions import ChannelBulkheadFullError
 from notifications.worker.dlq import DlqPublisher
 from notifications.common.schemas import NotificationJob
 from notifications.worker.repositories import NotificationDeliveryRepository
+from notifications.worker.retry import RetryPublisher
 from notifications.worker.processor.status_writer import mark_sent, mark_failure
 
 logger = logging.getLogger(__name__)
@@ -23,8 +25,10 @@ async def attempt_with_retries(
     attempt_send_fn: AttemptSendFn,
     delivery_repo: NotificationDeliveryRepository,
     dlq_publisher: DlqPublisher,
+    retry_publisher: RetryPublisher | None = None,
 ) -> None:
     attempts = existing_attempts
+    rejections = 0
 
     while attempts < max_attempts:
         attempts += 1
@@ -34,8 +38,32 @@ async def attempt_with_retries(
             return
 
         except Exception as exc:
+            # A saturated channel rejected the job before it reached the
+            # provider: defer it without spending a delivery attempt. Without
+            # a retry topic the job waits inline while holding its consumer
+            # slot, so only max_attempts rejections are free; after that they
+            # count like any other failure and the job ends up in the DLQ.
+            if isinstance(exc, ChannelBulkheadFullError):
+                rejections += 1
+                if retry_publisher is not None or rejections <= max_attempts:
+                    delay = _get_retry_delay(attempts, retry_delays)
+                    attempts -= 1
+                    if retry_publisher is not None:
+                        await retry_publisher.publish_retry(
+                            job, attempts=attempts, delay=delay, error_message=str(exc)
+                        )
+                        return
+
+                    logger.info(
+                        "Channel saturated, retrying job %s after %.2f sec",
+                        job.job_id,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
             error = str(exc)
-            is_last = attempts >= max_attempts
+            is_last = attempts >= max_attempts or not getattr(exc, "retryable", True)
 
             await mark_failure(
                 delivery_repo=delivery_repo,
@@ -50,6 +78,12 @@ async def attempt_with_retries(
                 return
 
             delay = _get_retry_delay(attempts, retry_delays)
+            if retry_publisher is not None:
+                await retry_publisher.publish_retry(
+                    job, attempts=attempts, delay=delay, error_message=error
+                )
+                return
+
             logger.info(
                 "Retrying job %s after %.2f sec (attempt %s/%s)",
                 job.job_id,
@@ -57,6 +57,7 @@ async def mark_sent(
         error_code=None,
         error_message=None,
         sent_at=datetime.now(timezone.utc),
+        created_at=job.created_at,
     )
     logger.info("Job %s SENT (attempt %s)", job.job_id, attempts)
 
@@ -79,6 +80,7 @@ async def mark_failure(
         error_code=None,
         error_message=error,
         sent_at=None,
+        created_at=job.created_at,
     )
     logger.warning(
         "Job %s %s on attempt %s: %s",
@@ -104,5 +106,6 @@ async def mark_expired(
         error_code=None,
         error_message=message,
         sent_at=None,
+        created_at=job.created_at,
     )
     logger.warning("Job %s EXPIRED (attempts=%s)", job.job_id, attempts)
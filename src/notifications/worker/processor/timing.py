@@ -36,20 +36,24 @@ async def handle_expiration_if_needed(
     return True
 
 
-async def wait_send_after_if_needed(
-    job: NotificationJob,
-    max_send_delay_seconds: int,
-) -> None:
+def send_after_delay_seconds(job: NotificationJob) -> float:
     if not job.send_after:
-        return
+        return 0.0
 
     now = datetime.now(timezone.utc)
     target = job.send_after.astimezone(timezone.utc)
+    return max(0.0, (target - now).total_seconds())
+
 
-    if target <= now:
+async def wait_send_after_if_needed(
+    job: NotificationJob,
+    max_send_delay_seconds: int,
+) -> None:
+    delay = send_after_delay_seconds(job)
+    if delay <= 0:
         return
 
-    delay = (target - now).total_seconds()
+    target = job.send_after.astimezone(timezone.utc)
     delay = min(delay, float(max_send_delay_seconds))
 
     if delay <= 0:
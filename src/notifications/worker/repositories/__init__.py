@@ -2,6 +2,17 @@ from notifications.worker.repositories.template_repo import TemplateRepository,
 from notifications.worker.repositories.notification_delivery_repo import (
     NotificationDeliveryRepository,
     NotificationDelivery,
+    DeliveryStatusRow,
+)
+from notifications.worker.repositories.delivery_status_buffer import (
+    DeliveryStatusBuffer,
+)
+from notifications.worker.repositories.delivery_partitions import (
+    DeliveryPartitionManager,
+)
+from notifications.worker.repositories.scheduled_job_repo import (
+    ScheduledJobRepository,
+    ScheduledJob,
 )
 
 __all__ = [
@@ -9,4 +20,9 @@ __all__ = [
     "Template",
     "NotificationDeliveryRepository",
     "NotificationDelivery",
+    "DeliveryStatusRow",
+    "DeliveryStatusBuffer",
+    "DeliveryPartitionManager",
+    "ScheduledJobRepository",
+    "ScheduledJob",
 ]
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+
+import asyncpg
+
+from notifications.common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "notification_delivery"
+ATTEMPTS_TABLE = "notification_attempts"
+KEYS_TABLE = "notification_delivery_keys"
+
+# Monthly-partitioned tables and the storage options of their new partitions.
+# The status table is updated in place, so leave room for HOT updates.
+PARTITIONED_TABLES = {
+    PARENT_TABLE: " WITH (fillfactor = 80)",
+    ATTEMPTS_TABLE: "",
+}
+
+# Any constant works as long as no other maintenance job uses it.
+_ADVISORY_LOCK_KEY = 0x6E6F7469  # "noti"
+
+# Expired keys are deleted in chunks so no single statement holds row locks
+# on a whole month of jobs.
+_KEYS_DELETE_BATCH = 10_000
+
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    index = moment.year * 12 + moment.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime, parent: str = PARENT_TABLE) -> str:
+    return f"{parent}_p{month:%Y%m}"
+
+
+def future_partitions(
+    now: datetime, months_ahead: int, parent: str = PARENT_TABLE
+) -> list[tuple[str, datetime, datetime]]:
+    return [
+        (
+            partition_name(month_start(now, offset), parent),
+            month_start(now, offset),
+            month_start(now, offset + 1),
+        )
+        for offset in range(months_ahead + 1)
+    ]
+
+
+def partition_month(name: str, parent: str = PARENT_TABLE) -> datetime | None:
+    match = re.fullmatch(rf"{re.escape(parent)}_p(\d{{4}})(\d{{2}})", name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+
+
+def expired_partitions(
+    names: list[str],
+    now: datetime,
+    retention_months: int,
+    parent: str = PARENT_TABLE,
+) -> list[str]:
+    if retention_months <= 0:
+        return []
+    cutoff = month_start(now, -retention_months)
+    expired = []
+    for name in names:
+        month = partition_month(name, parent)
+        if month is not None and month < cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+class DeliveryPartitionManager:
+    """Keeps monthly partitions of the delivery tables ahead of time and drops
+    the ones older than the retention window.
+
+    Every worker runs it; a transaction-level advisory lock lets one do the
+    work (session locks don't survive PgBouncer transaction pooling).
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        months_ahead: int,
+        retention_months: int,
+        lock_timeout_seconds: float = 5.0,
+    ) -> None:
+        self._pool = pool
+        self._months_ahead = months_ahead
+        self._retention_months = retention_months
+        self._lock_timeout_ms = int(lock_timeout_seconds * 1000)
+
+        self._m_created = metrics.counter("delivery_partitions_created_total")
+        self._m_dropped = metrics.counter("delivery_partitions_dropped_total")
+        self._m_errors = metrics.counter("delivery_partition_maintenance_errors_total")
+
+    async def run(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._m_errors.inc()
+                logger.exception("Delivery partition maintenance failed")
+            await asyncio.sleep(interval_seconds)
+
+    async def maintain(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        keys_cutoff: datetime | None = None
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                locked = await conn.fetchval(
+                    "SELECT pg_try_advisory_xact_lock($1)", _ADVISORY_LOCK_KEY
+                )
+                if not locked:
+                    return
+                await conn.execute(f"SET LOCAL lock_timeout = {self._lock_timeout_ms}")
+                for parent, storage in PARTITIONED_TABLES.items():
+                    if not await self._is_partitioned(conn, parent):
+                        logger.warning(
+                            "%s is not partitioned, skipping maintenance", parent
+                        )
+                        continue
+                    existing = await self._partitions(conn, parent)
+                    await self._create_future(conn, now, parent, storage, existing)
+                    dropped = await self._drop_expired(conn, now, parent, existing)
+                    if parent == PARENT_TABLE:
+                        keys_cutoff = self._keys_cutoff(now, existing, dropped)
+
+            # Outside the transaction, so the parent tables aren't kept
+            # locked while the keys are deleted. Deleting by range on every
+            # run picks up whatever an earlier failed run left behind.
+            if keys_cutoff is not None:
+                await self._delete_expired_keys(conn, keys_cutoff)
+
+    async def _create_future(
+        self,
+        conn: asyncpg.Connection,
+        now: datetime,
+        parent: str,
+        storage: str,
+        existing: list[str],
+    ) -> None:
+        for name, start, end in future_partitions(now, self._months_ahead, parent):
+            if name in existing:
+                continue
+            # DDL takes no bind parameters; the bounds are our own datetimes.
+            try:
+                async with conn.transaction():
+                    await conn.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {parent} '
+                        f"FOR VALUES FROM ('{start.isoformat()}') "
+                        f"TO ('{end.isoformat()}'){storage}"
+                    )
+            except asyncpg.PostgresError:
+                # Usually rows for this range already landed in the default
+                # partition; they have to be moved by hand.
+                self._m_errors.inc()
+                logger.exception("Failed to create partition %s", name)
+                continue
+            self._m_created.inc()
+            logger.info("Created partition %s [%s, %s)", name, start, end)
+
+    async def _drop_expired(
+        self,
+        conn: asyncpg.Connection,
+        now: datetime,
+        parent: str,
+        existing: list[str],
+    ) -> list[datetime]:
+        dropped = []
+        for name in expired_partitions(existing, now, self._retention_months, parent):
+            try:
+                async with conn.transaction():
+                    await conn.execute(
+                        f'ALTER TABLE {parent} DETACH PARTITION "{name}"'
+                    )
+                    await conn.execute(f'DROP TABLE "{name}"')
+            except asyncpg.PostgresError:
+                # Typically lock_timeout; the next run tries again.
+                self._m_errors.inc()
+                logger.exception("Failed to drop partition %s", name)
+                continue
+            dropped.append(partition_month(name, parent))
+            self._m_dropped.inc()
+            logger.info("Dropped expired partition %s", name)
+        return dropped
+
+    def _keys_cutoff(
+        self, now: datetime, existing: list[str], dropped: list[datetime]
+    ) -> datetime | None:
+        if self._retention_months <= 0:
+            return None
+        # Keys of a partition that failed to drop still map live rows.
+        kept = [
+            partition_month(name)
+            for name in expired_partitions(existing, now, self._retention_months)
+        ]
+        return min(
+            (month for month in kept if month not in dropped),
+            default=month_start(now, -self._retention_months),
+        )
+
+    @staticmethod
+    async def _delete_expired_keys(conn: asyncpg.Connection, cutoff: datetime) -> None:
+        while True:
+            status = await conn.execute(
+                f"""
+                DELETE FROM {KEYS_TABLE}
+                WHERE job_id IN (
+                    SELECT job_id FROM {KEYS_TABLE}
+                    WHERE created_at < $1
+                    LIMIT $2
+                )
+                """,
+                cutoff,
+                _KEYS_DELETE_BATCH,
+            )
+            deleted = int(status.split()[-1])
+            if deleted:
+                logger.info("Deleted %s delivery keys before %s", deleted, cutoff)
+            if deleted < _KEYS_DELETE_BATCH:
+                return
+
+    @staticmethod
+    async def _is_partitioned(conn: asyncpg.Connection, parent: str) -> bool:
+        return bool(
+            await conn.fetchval(
+                """
+                SELECT 1
+                FROM pg_partitioned_table
+                WHERE partrelid = to_regclass($1)
+                """,
+                parent,
+            )
+        )
+
+    @staticmethod
+    async def _partitions(conn: asyncpg.Connection, parent: str) -> list[str]:
+        rows = await conn.fetch(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass($1)
+            """,
+            parent,
+        )
+        return [row["relname"] for row in rows]
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from notifications.common.metrics import metrics
+from notifications.worker.repositories.notification_delivery_repo import (
+    DeliveryStatusRow,
+    NotificationDelivery,
+    NotificationDeliveryRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class DeliveryStatusBuffer:
+    """Write-behind front for NotificationDeliveryRepository.
+
+    ``save_status`` queues the row and returns once the batch holding it is
+    flushed, so a job (and its Kafka offset) only completes after its status
+    is durable. An idle buffer flushes on the next loop iteration; while a
+    write is in flight, rows collect behind it and leave when it finishes,
+    after ``flush_interval_seconds``, or once ``max_batch_size`` are queued.
+    """
+
+    def __init__(
+        self,
+        repo: NotificationDeliveryRepository,
+        flush_interval_seconds: float,
+        max_batch_size: int,
+    ) -> None:
+        self._repo = repo
+        self._interval = flush_interval_seconds
+        self._max_batch_size = max_batch_size
+
+        # Latest row per job, kept until its write finishes (what claim/get
+        # see), and every queued row in save order (what the attempt log
+        # receives).
+        self._rows: dict[UUID, DeliveryStatusRow] = {}
+        self._pending: list[DeliveryStatusRow] = []
+        self._waiters: list[asyncio.Future] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        self._m_batch_size = metrics.histogram(
+            "delivery_status_flush_size", buckets=BATCH_SIZE_BUCKETS
+        )
+        self._m_flush_seconds = metrics.histogram("delivery_status_flush_seconds")
+        self._m_coalesced = metrics.counter("delivery_status_coalesced_total")
+        self._m_errors = metrics.counter("delivery_status_flush_errors_total")
+
+    async def get_by_job_id(self, job_id: UUID) -> Optional[NotificationDelivery]:
+        row = self._rows.get(job_id)
+        if row is not None:
+            return row.to_delivery()
+        return await self._repo.get_by_job_id(job_id)
+
+    async def claim(
+        self, *, job_id: UUID, user_id: UUID, channel: str, created_at: datetime
+    ) -> Optional[NotificationDelivery]:
+        row = self._rows.get(job_id)
+        if row is not None:
+            return row.to_delivery()
+        return await self._repo.claim(
+            job_id=job_id, user_id=user_id, channel=channel, created_at=created_at
+        )
+
+    async def save_status(
+        self,
+        *,
+        job_id: UUID,
+        user_id: UUID,
+        channel: str,
+        status: str,
+        attempts: int,
+        error_code: Optional[str],
+        error_message: Optional[str],
+        sent_at: Optional[datetime],
+        created_at: datetime,
+    ) -> None:
+        if job_id in self._rows:
+            self._m_coalesced.inc()
+        row = DeliveryStatusRow(
+            job_id=job_id,
+            user_id=user_id,
+            channel=channel,
+            status=status,
+            attempts=attempts,
+            error_code=error_code,
+            error_message=error_message,
+            sent_at=sent_at,
+            created_at=created_at,
+        )
+        self._rows[job_id] = row
+        self._pending.append(row)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self._flush_tasks:
+                self._flush_handle = loop.call_later(self._interval, self._flush)
+            else:
+                # Nothing to batch behind: don't make a lone writer wait.
+                self._flush_handle = loop.call_soon(self._flush)
+        await asyncio.shield(waiter)
+
+    async def close(self) -> None:
+        self._flush()
+        while self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        waiters, self._waiters = self._waiters, []
+
+        task = asyncio.create_task(
+            self._write(rows, waiters), name="delivery-status-flush"
+        )
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flushed)
+
+    def _flushed(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        # Rows that queued up behind this write go out right away.
+        if self._pending and not self._flush_tasks:
+            self._flush()
+
+    async def _write(
+        self, rows: list[DeliveryStatusRow], waiters: list[asyncio.Future]
+    ) -> None:
+        self._m_batch_size.observe(len(rows))
+        started = asyncio.get_running_loop().time()
+        try:
+            await self._repo.save_status_many(rows)
+        except Exception as exc:
+            self._m_errors.inc()
+            logger.exception("Failed to flush %s delivery statuses", len(rows))
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+                    waiter.exception()
+        else:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        finally:
+            for row in rows:
+                if self._rows.get(row.job_id) is row:
+                    del self._rows[row.job_id]
+            self._m_flush_seconds.observe(asyncio.get_running_loop().time() - started)
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 from uuid import UUID
 
 import asyncpg
 
+from notifications.common.pg import statements
+
 
 @dataclass
 class NotificationDelivery:
@@ -14,8 +16,163 @@ class NotificationDelivery:
     user_id: UUID
     status: str
     attempts: int
+    sent_at: Optional[datetime]
+
+
+@dataclass
+class DeliveryStatusRow:
+    job_id: UUID
+    user_id: UUID
+    channel: str
+    status: str
+    attempts: int
+    error_code: Optional[str]
     error_message: Optional[str]
     sent_at: Optional[datetime]
+    created_at: datetime
+
+    def status_args(self) -> tuple:
+        return (
+            self.job_id,
+            self.user_id,
+            self.channel,
+            self.status,
+            self.attempts,
+            self.sent_at,
+            self.created_at,
+        )
+
+    def attempt_record(self) -> tuple:
+        return (
+            self.job_id,
+            self.created_at,
+            self.attempts,
+            self.status,
+            self.error_code,
+            self.error_message,
+        )
+
+    def to_delivery(self) -> NotificationDelivery:
+        return NotificationDelivery(
+            job_id=self.job_id,
+            user_id=self.user_id,
+            status=self.status,
+            attempts=self.attempts,
+            sent_at=self.sent_at,
+        )
+
+
+# notification_delivery only holds the current state of a job; error details
+# of every attempt are appended to notification_attempts instead, so status
+# updates stay narrow and none of the updated columns is indexed (HOT-friendly).
+#
+# The table is partitioned by created_at, so its primary key can't keep job_id
+# unique on its own. notification_delivery_keys does, and records the
+# created_at a job was first stored with; every statement resolves the row
+# through it, so a job always lands on its original row even when the
+# timestamp it arrives with differs (e.g. rows migrated from before
+# partitioning).
+_UPSERT_STATUS = statements.register(
+    "delivery.upsert_status",
+    """
+    WITH new_key AS (
+        INSERT INTO notification_delivery_keys (job_id, created_at)
+        VALUES ($1, $7)
+        ON CONFLICT (job_id) DO NOTHING
+        RETURNING created_at
+    )
+    INSERT INTO notification_delivery (
+        job_id,
+        user_id,
+        channel,
+        status,
+        attempts,
+        sent_at,
+        created_at
+    )
+    SELECT
+        $1::uuid,
+        $2::uuid,
+        $3::varchar,
+        $4::varchar,
+        $5::integer,
+        $6::timestamptz,
+        coalesce(
+            (SELECT created_at FROM new_key),
+            (SELECT created_at FROM notification_delivery_keys WHERE job_id = $1),
+            $7::timestamptz
+        )
+    ON CONFLICT (job_id, created_at) DO UPDATE
+    SET
+        status = EXCLUDED.status,
+        attempts = EXCLUDED.attempts,
+        sent_at = EXCLUDED.sent_at,
+        updated_at = now()
+    """,
+)
+
+ATTEMPT_COLUMNS = [
+    "job_id",
+    "job_created_at",
+    "attempt",
+    "status",
+    "error_code",
+    "error_message",
+]
+
+_APPEND_ATTEMPT = statements.register(
+    "delivery.append_attempt",
+    """
+    INSERT INTO notification_attempts (
+        job_id, job_created_at, attempt, status, error_code, error_message
+    )
+    VALUES ($1, $2, $3, $4, $5, $6)
+    """,
+)
+
+# The key lookup lets the planner prune to the job's partition.
+_GET_BY_JOB_ID = statements.register(
+    "delivery.get_by_job_id",
+    """
+    SELECT job_id, user_id, status, attempts, sent_at
+    FROM notification_delivery
+    WHERE job_id = $1
+      AND created_at = (
+          SELECT created_at FROM notification_delivery_keys WHERE job_id = $1
+      );
+    """,
+)
+
+# One round trip: registers a new job as PROCESSING, or returns the state it
+# already had under whatever created_at it was first stored with. The SELECT
+# runs on the statement snapshot, so it never sees the rows inserted by the
+# CTEs.
+_CLAIM = statements.register(
+    "delivery.claim",
+    """
+    WITH new_key AS (
+        INSERT INTO notification_delivery_keys (job_id, created_at)
+        VALUES ($1, $4)
+        ON CONFLICT (job_id) DO NOTHING
+        RETURNING created_at
+    ),
+    claimed AS (
+        INSERT INTO notification_delivery (
+            job_id, user_id, channel, status, attempts, created_at
+        )
+        SELECT $1::uuid, $2::uuid, $3::varchar, 'PROCESSING', 0, created_at
+        FROM new_key
+        ON CONFLICT (job_id, created_at) DO NOTHING
+    )
+    SELECT job_id, user_id, status, attempts, sent_at
+    FROM notification_delivery
+    WHERE job_id = $1
+      AND created_at = (
+          SELECT created_at FROM notification_delivery_keys WHERE job_id = $1
+      )
+      AND NOT EXISTS (SELECT 1 FROM new_key);
+    """,
+)
 
 
 class NotificationDeliveryRepository:
@@ -23,13 +180,27 @@ class NotificationDeliveryRepository:
         self._pool = pool
 
     async def get_by_job_id(self, job_id: UUID) -> Optional[NotificationDelivery]:
-        query = """
-            SELECT job_id, user_id, status, attempts, error_message, sent_at
-            FROM notification_delivery
-            WHERE job_id = $1;
-        """
         async with self._pool.acquire() as conn:
-            row = await conn.fetchrow(query, job_id)
+            row = await statements.fetchrow(conn, _GET_BY_JOB_ID, job_id)
+
+        if row is None:
+            return None
+
+        return NotificationDelivery(
+            job_id=row["job_id"],
+            user_id=row["user_id"],
+            status=row["status"],
+            attempts=row["attempts"],
+            sent_at=row["sent_at"],
+        )
+
+    async def claim(
+        self, *, job_id: UUID, user_id: UUID, channel: str, created_at: datetime
+    ) -> Optional[NotificationDelivery]:
+        async with self._pool.acquire() as conn:
+            row = await statements.fetchrow(
+                conn, _CLAIM, job_id, user_id, channel, created_at
+            )
 
         if row is None:
             return None
@@ -39,7 +210,6 @@ class NotificationDeliveryRepository:
             user_id=row["user_id"],
             status=row["status"],
             attempts=row["attempts"],
-            error_message=row["error_message"],
             sent_at=row["sent_at"],
         )
 
@@ -54,37 +224,37 @@ class NotificationDeliveryRepository:
         error_code: Optional[str],
         error_message: Optional[str],
         sent_at: Optional[datetime],
+        created_at: datetime,
     ) -> None:
-        query = """
-            INSERT INTO notification_delivery (
-                job_id,
-                user_id,
-                channel,
-                status,
-                attempts,
-                error_code,
-                error_message,
-                sent_at
-            )
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-            ON CONFLICT (job_id) DO UPDATE
-            SET
-                status = EXCLUDED.status,
-                attempts = EXCLUDED.attempts,
-                error_code = EXCLUDED.error_code,
-                error_message = EXCLUDED.error_message,
-                sent_at = EXCLUDED.sent_at,
-                updated_at = now()
-        """
+        row = DeliveryStatusRow(
+            job_id=job_id,
+            user_id=user_id,
+            channel=channel,
+            status=status,
+            attempts=attempts,
+            error_code=error_code,
+            error_message=error_message,
+            sent_at=sent_at,
+            created_at=created_at,
+        )
         async with self._pool.acquire() as conn:
-            await conn.execute(
-                query,
-                job_id,
-                user_id,
-                channel,
-                status,
-                attempts,
-                error_code,
-                error_message,
-                sent_at,
-            )
+            async with conn.transaction():
+                await statements.execute(conn, _UPSERT_STATUS, *row.status_args())
+                await statements.execute(conn, _APPEND_ATTEMPT, *row.attempt_record())
+
+    async def save_status_many(self, rows: Sequence[DeliveryStatusRow]) -> None:
+        # Rows arrive in save order: the last one per job is its current
+        # state, while every row is an attempt worth keeping in the log.
+        latest = {row.job_id: row for row in rows}
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await statements.executemany(
+                    conn,
+                    _UPSERT_STATUS,
+                    [row.status_args() for row in latest.values()],
+                )
+                await conn.copy_records_to_table(
+                    "notification_attempts",
+                    records=[row.attempt_record() for row in rows],
+                    columns=ATTEMPT_COLUMNS,
+                )
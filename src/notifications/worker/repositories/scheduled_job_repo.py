@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+import asyncpg
+
+from notifications.common.schemas import NotificationJob
+
+
+@dataclass
+class ScheduledJob:
+    job_id: UUID
+    due_at: datetime
+    payload: str
+
+
+PublishDueFn = Callable[[list[ScheduledJob]], Awaitable[None]]
+
+
+class ScheduledJobRepository:
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    async def park(self, job: NotificationJob, due_at: datetime) -> None:
+        query = """
+            INSERT INTO scheduled_jobs (job_id, due_at, payload)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (job_id) DO UPDATE
+            SET
+                due_at = EXCLUDED.due_at,
+                payload = EXCLUDED.payload
+        """
+        async with self._pool.acquire() as conn:
+            await conn.execute(query, job.job_id, due_at, job.model_dump_json())
+
+    async def next_due_at(self) -> Optional[datetime]:
+        query = "SELECT min(due_at) FROM scheduled_jobs;"
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval(query)
+
+    async def dispatch_due(self, limit: int, publish: PublishDueFn) -> int:
+        select_query = """
+            SELECT job_id, due_at, payload
+            FROM scheduled_jobs
+            WHERE due_at <= now()
+            ORDER BY due_at
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED;
+        """
+        delete_query = "DELETE FROM scheduled_jobs WHERE job_id = ANY($1::uuid[]);"
+
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(select_query, limit)
+                if not rows:
+                    return 0
+
+                jobs = [
+                    ScheduledJob(
+                        job_id=row["job_id"],
+                        due_at=row["due_at"],
+                        payload=row["payload"],
+                    )
+                    for row in rows
+                ]
+                await publish(jobs)
+                await conn.execute(delete_query, [job.job_id for job in jobs])
+
+        return len(jobs)
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import time
 from dataclasses import dataclass
 from typing import Optional
 
 import asyncpg
 
+from notifications.common.metrics import metrics
+from notifications.common.pg import statements
+
+logger = logging.getLogger(__name__)
+
+TemplateKey = tuple[str, str, str]
+
+_GET_TEMPLATE = statements.register(
+    "templates.get",
+    """
+    SELECT template_code, locale, channel, subject, body
+    FROM templates
+    WHERE template_code = $1
+      AND locale        = $2
+      AND channel       = $3
+    LIMIT 1;
+    """,
+)
+
 
 @dataclass
 class Template:
@@ -16,8 +39,24 @@ class Template:
 
 
 class TemplateRepository:
-    def __init__(self, pool: asyncpg.Pool) -> None:
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        cache_ttl_seconds: float = 0.0,
+        negative_ttl_seconds: float = 0.0,
+    ) -> None:
         self._pool = pool
+        self._cache_ttl = cache_ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._cache: dict[TemplateKey, tuple[float, Optional[Template]]] = {}
+        # Bumped on every invalidation; a fetch that raced one is not cached.
+        self._generation = 0
+
+        self._m_hits = metrics.counter("template_repo_cache_hits_total")
+        self._m_misses = metrics.counter("template_repo_cache_misses_total")
+        self._m_invalidations = metrics.counter(
+            "template_repo_cache_invalidations_total"
+        )
 
     async def get_template(
         self,
@@ -25,16 +64,34 @@ class TemplateRepository:
         locale: str,
         channel: str,
     ) -> Optional[Template]:
-        query = """
-            SELECT template_code, locale, channel, subject, body
-            FROM templates
-            WHERE template_code = $1
-              AND locale        = $2
-              AND channel       = $3
-            LIMIT 1;
-        """
+        key = (template_code, locale, channel)
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, template = cached
+            if expires_at > time.monotonic():
+                self._m_hits.inc()
+                return template
+            del self._cache[key]
+
+        self._m_misses.inc()
+        generation = self._generation
+        template = await self._fetch_template(template_code, locale, channel)
+
+        ttl = self._cache_ttl if template is not None else self._negative_ttl
+        if ttl > 0 and generation == self._generation:
+            self._cache[key] = (time.monotonic() + ttl, template)
+        return template
+
+    async def _fetch_template(
+        self,
+        template_code: str,
+        locale: str,
+        channel: str,
+    ) -> Optional[Template]:
         async with self._pool.acquire() as conn:
-            row = await conn.fetchrow(query, template_code, locale, channel)
+            row = await statements.fetchrow(
+                conn, _GET_TEMPLATE, template_code, locale, channel
+            )
 
         if row is None:
             return None
@@ -46,3 +103,90 @@ class TemplateRepository:
             subject=row["subject"],
             body=row["body"],
         )
+
+    async def preload(self, limit: int | None = None) -> list[Template]:
+        # Campaign references are the best usage signal we have in the schema.
+        query = """
+            SELECT t.template_code, t.locale, t.channel, t.subject, t.body
+            FROM templates t
+            LEFT JOIN (
+                SELECT template_code, count(*) AS uses
+                FROM campaigns
+                GROUP BY template_code
+            ) c ON c.template_code = t.template_code
+            ORDER BY coalesce(c.uses, 0) DESC, t.updated_at DESC
+            LIMIT $1;
+        """
+        generation = self._generation
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(query, limit)
+
+        templates = [
+            Template(
+                template_code=row["template_code"],
+                locale=row["locale"],
+                channel=row["channel"],
+                subject=row["subject"],
+                body=row["body"],
+            )
+            for row in rows
+        ]
+        if self._cache_ttl > 0 and generation == self._generation:
+            expires_at = time.monotonic() + self._cache_ttl
+            for template in templates:
+                key = (template.template_code, template.locale, template.channel)
+                self._cache[key] = (expires_at, template)
+        return templates
+
+    def invalidate(self, template_code: str, locale: str, channel: str) -> None:
+        self._generation += 1
+        self._cache.pop((template_code, locale, channel), None)
+        self._m_invalidations.inc()
+
+    def invalidate_all(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+        self._m_invalidations.inc()
+
+    def _on_notification(self, conn, pid, channel, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            self.invalidate(data["template_code"], data["locale"], data["channel"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(
+                "Malformed template notification %r, dropping cache", payload
+            )
+            self.invalidate_all()
+            return
+        logger.info(
+            "Template cache invalidated: code=%s locale=%s channel=%s",
+            data["template_code"],
+            data["locale"],
+            data["channel"],
+        )
+
+    async def listen_for_invalidations(
+        self, dsn: str, channel: str, reconnect_delay: float = 5.0
+    ) -> None:
+        while True:
+            conn: asyncpg.Connection | None = None
+            try:
+                conn = await asyncpg.connect(dsn=dsn)
+                await conn.add_listener(channel, self._on_notification)
+                logger.info("Listening for template changes on %s", channel)
+
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await closed.wait()
+                logger.warning("Template listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Template listener failed")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+            # Anything may change while we are not listening.
+            self.invalidate_all()
+            await asyncio.sleep(reconnect_delay)
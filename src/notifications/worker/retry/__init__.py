@@ -0,0 +1,6 @@
+from notifications.worker.retry.publisher import (
+    RetryPublisher,
+    parse_retry_headers,
+)
+
+__all__ = ["RetryPublisher", "parse_retry_headers"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Sequence
+
+from aiokafka import AIOKafkaProducer
+
+from notifications.common.schemas import NotificationJob
+from notifications.common.config import Settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_ATTEMPTS_HEADER = "x-retry-attempts"
+RETRY_DUE_AT_HEADER = "x-retry-due-at-ms"
+RETRY_ERROR_HEADER = "x-retry-error"
+
+MAX_ERROR_HEADER_LENGTH = 512
+
+
+def parse_retry_headers(
+    headers: Sequence[tuple[str, bytes]] | None,
+) -> tuple[int, int | None]:
+    attempts = 0
+    due_at_ms: int | None = None
+
+    for key, value in headers or ():
+        try:
+            if key == RETRY_ATTEMPTS_HEADER:
+                attempts = int(value.decode("ascii"))
+            elif key == RETRY_DUE_AT_HEADER:
+                due_at_ms = int(value.decode("ascii"))
+        except (UnicodeDecodeError, ValueError):
+            logger.warning("Ignoring malformed retry header %s=%r", key, value)
+
+    return attempts, due_at_ms
+
+
+class RetryPublisher:
+    def __init__(self, settings: Settings, producer: AIOKafkaProducer) -> None:
+        self._settings = settings
+        self._producer = producer
+
+    async def publish_retry(
+        self,
+        job: NotificationJob,
+        attempts: int,
+        delay: float,
+        error_message: str | None,
+    ) -> None:
+        topic = self._settings.retry_topic_for_delay(delay)
+        due_at_ms = int((time.time() + delay) * 1000)
+        headers = [
+            (RETRY_ATTEMPTS_HEADER, str(attempts).encode("ascii")),
+            (RETRY_DUE_AT_HEADER, str(due_at_ms).encode("ascii")),
+        ]
+        if error_message:
+            headers.append(
+                (
+                    RETRY_ERROR_HEADER,
+                    error_message[:MAX_ERROR_HEADER_LENGTH].encode("utf-8"),
+                )
+            )
+
+        logger.info(
+            "Scheduling retry of job %s via topic=%s in %.2f sec (attempt %s)",
+            job.job_id,
+            topic,
+            delay,
+            attempts,
+        )
+
+        await self._producer.send_and_wait(
+            topic=topic,
+            key=str(job.job_id).encode("utf-8"),
+            value=job.model_dump_json().encode("utf-8"),
+            headers=headers,
+        )
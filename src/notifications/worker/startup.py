@@ -1,33 +1,51 @@
 from __future__ import annotations
 
-import asyncio
+import importlib.util
 import logging
+import time
 import httpx
 
 import asyncpg
 from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaConnectionError
 
+from notifications.common.metrics import metrics
+from notifications.common.pg import create_pool
 from notifications.worker.core.config import settings
+from notifications.worker.core.template_renderer import (
+    template_cache,
+    template_loader,
+    template_name,
+)
+from notifications.worker.repositories import TemplateRepository
 from notifications.common.retry import retry_async   # добавлен импорт
 
 logger = logging.getLogger(__name__)
 
 
 async def create_http_client() -> httpx.AsyncClient:
-    return httpx.AsyncClient(timeout=2.0)
+    http2 = settings.auth_http2_enabled
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("h2 is not installed, auth client falls back to HTTP/1.1")
+        http2 = False
 
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.auth_http_timeout_seconds,
+            connect=settings.auth_http_connect_timeout_seconds,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.auth_http_max_connections,
+            max_keepalive_connections=settings.auth_http_max_keepalive_connections,
+            keepalive_expiry=settings.auth_http_keepalive_expiry_seconds,
+        ),
+        http2=http2,
+    )
 
-async def create_db_pool() -> asyncpg.Pool:
-    async def _create_pool():
-        return await asyncpg.create_pool(
-            dsn=settings.db_asyncpg_dsn,
-            min_size=1,
-            max_size=5,
-        )
 
+async def create_db_pool() -> asyncpg.Pool:
     pool = await retry_async(
-        _create_pool,
+        lambda: create_pool(settings),
         max_attempts=10,
         delay=1,
         exceptions=(OSError, asyncpg.PostgresError),
@@ -56,3 +74,39 @@ async def create_kafka_producer() -> AIOKafkaProducer:
     )
     logger.info("Kafka producer started (for DLQ)")
     return producer
+
+
+async def warm_up_templates(template_repo: TemplateRepository) -> int:
+    started = time.monotonic()
+    limit = settings.template_warmup_limit or None
+    templates = await template_repo.preload(limit)
+
+    compiled = 0
+    for template in templates:
+        template_loader.put(
+            template_name(template.template_code, template.locale, template.channel),
+            template.body or "",
+        )
+        for source in (template.subject or "", template.body or ""):
+            try:
+                template_cache.get(source)
+            except Exception:
+                logger.exception(
+                    "Failed to precompile template code=%s locale=%s channel=%s",
+                    template.template_code,
+                    template.locale,
+                    template.channel,
+                )
+                continue
+            compiled += 1
+
+    duration = time.monotonic() - started
+    metrics.gauge("template_warmup_duration_seconds").set(duration)
+    metrics.gauge("template_warmup_templates").set(len(templates))
+    logger.info(
+        "Template warm-up finished: %s templates, %s compiled sources in %.3f sec",
+        len(templates),
+        compiled,
+        duration,
+    )
+    return len(templates)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+from notifications.common import health_files
+from notifications.common.config import Settings
+from notifications.common.health_files import (
+    clear_ready,
+    instance_paths,
+    mark_ready,
+    read_heartbeat,
+    write_heartbeat,
+)
+
+logger = logging.getLogger(__name__)
+
+ChildTarget = Callable[[str], None]
+
+
+def instance_name(index: int) -> str:
+    return f"w{index}"
+
+
+def aggregate_health(instances: list[str]) -> tuple[bool, float | None]:
+    ready = True
+    missing_heartbeat = False
+    oldest_heartbeat: float | None = None
+
+    for instance in instances:
+        ready_path, heartbeat_path = instance_paths(instance)
+        ready = ready and ready_path.exists()
+
+        heartbeat = read_heartbeat(heartbeat_path)
+        if heartbeat is None:
+            missing_heartbeat = True
+        elif oldest_heartbeat is None or heartbeat < oldest_heartbeat:
+            oldest_heartbeat = heartbeat
+
+    if missing_heartbeat:
+        return False, None
+    return ready, oldest_heartbeat
+
+
+class WorkerSupervisor:
+    def __init__(
+        self, settings: Settings, processes: int, child_target: ChildTarget
+    ) -> None:
+        self._settings = settings
+        self._processes = processes
+        self._child_target = child_target
+        self._ctx = multiprocessing.get_context("spawn")
+        self._children: dict[str, BaseProcess] = {}
+        self._started_at: dict[str, float] = {}
+        self._restarts: dict[str, int] = {}
+        self._restart_at: dict[str, float] = {}
+        self._stop_event = asyncio.Event()
+
+    async def run(self) -> None:
+        logger.info("Worker supervisor starting %s processes", self._processes)
+        clear_ready()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._handle_signal, sig)
+            except NotImplementedError:
+                logger.warning("Signal handlers not supported in this environment")
+
+        for index in range(self._processes):
+            self._spawn(instance_name(index))
+
+        try:
+            while not self._stop_event.is_set():
+                self._restart_exited()
+                self._publish_health()
+                try:
+                    await asyncio.wait_for(
+                        self._stop_event.wait(),
+                        self._settings.worker_supervisor_interval_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            clear_ready()
+            await self._shutdown_children()
+
+    def _handle_signal(self, sig: signal.Signals) -> None:
+        logger.info("Supervisor received signal %s, stopping workers...", sig)
+        self._stop_event.set()
+
+    def _spawn(self, instance: str) -> None:
+        for path in instance_paths(instance):
+            path.unlink(missing_ok=True)
+
+        process = self._ctx.Process(
+            target=self._child_target,
+            args=(instance,),
+            name=f"notification-worker-{instance}",
+        )
+        process.start()
+        self._children[instance] = process
+        self._started_at[instance] = time.monotonic()
+        logger.info("Started worker process %s (pid=%s)", instance, process.pid)
+
+    def _restart_exited(self) -> None:
+        now = time.monotonic()
+        for instance, process in list(self._children.items()):
+            if process.is_alive():
+                continue
+
+            restart_at = self._restart_at.get(instance)
+            if restart_at is None:
+                restart_at = now + self._restart_delay(instance, now)
+                self._restart_at[instance] = restart_at
+                logger.error(
+                    "Worker process %s (pid=%s) exited with code %s,"
+                    " restarting in %.1f sec",
+                    instance,
+                    process.pid,
+                    process.exitcode,
+                    restart_at - now,
+                )
+            if now < restart_at:
+                continue
+
+            del self._restart_at[instance]
+            process.close()
+            self._spawn(instance)
+
+    def _restart_delay(self, instance: str, now: float) -> float:
+        # Back off exponentially while a child keeps crashing; a child that
+        # stayed up longer than the maximum delay starts over from the minimum.
+        max_delay = self._settings.worker_restart_backoff_max_seconds
+        if now - self._started_at.get(instance, now) >= max_delay:
+            self._restarts[instance] = 0
+        restarts = self._restarts.get(instance, 0)
+        self._restarts[instance] = restarts + 1
+        return min(
+            self._settings.worker_restart_backoff_seconds * 2**restarts, max_delay
+        )
+
+    def _publish_health(self) -> None:
+        ready, heartbeat = aggregate_health(list(self._children))
+        if ready:
+            mark_ready()
+        else:
+            clear_ready()
+
+        if heartbeat is not None:
+            try:
+                write_heartbeat(heartbeat)
+            except OSError:
+                logger.warning("Failed to write %s", health_files.HEARTBEAT_PATH)
+
+    async def _shutdown_children(self) -> None:
+        for process in self._children.values():
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self._settings.worker_shutdown_timeout_seconds
+        for instance, process in self._children.items():
+            remaining = max(0.0, deadline - time.monotonic())
+            await asyncio.to_thread(process.join, remaining)
+            if process.is_alive():
+                logger.warning(
+                    "Worker process %s did not stop in time, killing", instance
+                )
+                process.kill()
+                await asyncio.to_thread(process.join)
+            logger.info(
+                "Worker process %s exited with code %s", instance, process.exitcode
+            )
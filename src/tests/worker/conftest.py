@@ -32,6 +32,7 @@ class FakeTemplateRepo:
 class FakeDeliveryRepo:
     def __init__(self) -> None:
         self.get_by_job_id = AsyncMock(return_value=None)
+        self.claim = AsyncMock(return_value=None)
         self.save_status = AsyncMock()
 
 
@@ -39,6 +40,10 @@ class FakeAuthClient:
     def __init__(self, *, email: str | None = None) -> None:
         self._email = email
         self.get_user_contacts = AsyncMock(side_effect=self._get_contacts)
+        self.get_many_user_contacts = AsyncMock(side_effect=self._get_many_contacts)
+
+    async def _get_many_contacts(self, user_ids):
+        return {user_id: await self._get_contacts(user_id) for user_id in user_ids}
 
     async def _get_contacts(self, user_id):
         return UserContacts(
@@ -55,6 +60,16 @@ class FakeDlqPublisher:
         self.publish_raw = AsyncMock()
 
 
+class FakeRetryPublisher:
+    def __init__(self) -> None:
+        self.publish_retry = AsyncMock()
+
+
+class FakeDelayedDispatcher:
+    def __init__(self) -> None:
+        self.park = AsyncMock()
+
+
 class FakeEmailSender:
     def __init__(self) -> None:
         self.send = AsyncMock()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+from notifications.common.config import Settings
+from notifications.worker.auth import AuthClient
+
+
+def _auth_client(handler, **overrides) -> AuthClient:
+    settings = Settings(
+        auth_base_url="http://auth",
+        contact_cache_size=0,
+        auth_batch_enabled=True,
+        **overrides,
+    )
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AuthClient(settings, http)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_sent_as_one_bulk_request():
+    known, unknown = uuid4(), uuid4()
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        ids = json.loads(request.content)["user_ids"]
+        assert set(ids) == {str(known), str(unknown)}
+        return httpx.Response(
+            200, json={"users": [{"id": str(known), "email": "known@example.com"}]}
+        )
+
+    client = _auth_client(handler)
+    contacts = await client.get_many_user_contacts([known, unknown, known])
+
+    assert [r.method for r in requests] == ["POST"]
+    assert contacts[known].email == "known@example.com"
+    assert contacts[unknown].email == f"user-{unknown}@example.com"
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_single_lookups_without_bulk_endpoint():
+    user_ids = [uuid4() for _ in range(3)]
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if request.method == "POST":
+            return httpx.Response(404)
+        user_id = UUID(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json={"email": f"real-{user_id}@example.com"})
+
+    client = _auth_client(handler)
+    contacts = await client.get_many_user_contacts(user_ids)
+    assert calls == ["POST", "GET", "GET", "GET"]
+    assert all(contacts[u].email == f"real-{u}@example.com" for u in user_ids)
+
+    calls.clear()
+    await client.get_many_user_contacts([uuid4(), uuid4()])
+    assert calls == ["GET", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_lookups_beyond_max_batch_size_are_split():
+    sizes: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["user_ids"]
+        sizes.append(len(ids))
+        return httpx.Response(200, json={"users": [{"id": i} for i in ids]})
+
+    client = _auth_client(handler, auth_batch_max_size=4, auth_batch_window_ms=50)
+    await asyncio.wait_for(
+        client.get_many_user_contacts([uuid4() for _ in range(10)]), 1
+    )
+
+    assert sorted(sizes) == [2, 4, 4]
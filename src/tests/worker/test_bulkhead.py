@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from notifications.common.config import Settings
+from notifications.common.exceptions import ChannelBulkheadFullError
+from notifications.worker.processor.bulkhead import ChannelBulkheads
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_rejects_when_channel_queue_is_full():
+    bulkheads = ChannelBulkheads({"email": 1}, {"email": 1})
+    release = asyncio.Event()
+
+    async def send() -> None:
+        async with bulkheads.slot("email"):
+            await release.wait()
+
+    running = asyncio.create_task(send())
+    queued = asyncio.create_task(send())
+    await asyncio.sleep(0)
+
+    email = bulkheads.get("email")
+    assert (email.active, email.waiting) == (1, 1)
+
+    with pytest.raises(ChannelBulkheadFullError):
+        async with bulkheads.slot("email"):
+            pass
+
+    async with bulkheads.slot("push"):
+        pass
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert (email.active, email.waiting) == (0, 0)
+
+
+def test_channel_limits_are_parsed_from_settings():
+    settings = Settings(
+        channel_concurrency_raw="email=10, push=50",
+        channel_queue_depth_raw="email=100",
+    )
+
+    assert settings.channel_concurrency == {"email": 10, "push": 50}
+    assert settings.channel_queue_depth == {"email": 100}
+
+    with pytest.raises(ValueError):
+        _ = Settings(channel_concurrency_raw="email").channel_concurrency
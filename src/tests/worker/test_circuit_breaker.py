@@ -0,0 +1,55 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from notifications.common.config import Settings
+from notifications.common.exceptions import CircuitOpenError
+from notifications.worker.auth import AuthClient
+from notifications.worker.auth.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+
+def test_breaker_opens_and_recovers_after_successful_probe():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout_seconds=0)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_auth_client_fails_fast_while_circuit_is_open():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectTimeout("auth is down", request=request)
+
+    settings = Settings(
+        auth_base_url="http://auth",
+        contact_cache_size=0,
+        auth_circuit_failure_threshold=3,
+        auth_circuit_reset_seconds=0.05,
+    )
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AuthClient(settings, http)
+
+    for _ in range(10):
+        user_id = uuid4()
+        contacts = await client.get_user_contacts(user_id)
+        assert contacts.email == f"user-{user_id}@example.com"
+    assert calls == 3
+
+    await asyncio.sleep(0.06)
+    await client.get_user_contacts(uuid4())
+    assert calls == 4
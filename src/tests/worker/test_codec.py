@@ -0,0 +1,26 @@
+import pytest
+
+from notifications.common.codec import decode_job, encode_json
+from notifications.common.exceptions import InvalidJobPayloadError
+from tests.worker.conftest import make_notification_job
+
+
+def test_encode_decode_roundtrip():
+    job = make_notification_job()
+
+    assert decode_job(encode_json(job)) == job
+    assert decode_job(encode_json(job.model_dump(mode="json"))) == job
+
+
+def test_decode_invalid_json_is_classified():
+    with pytest.raises(InvalidJobPayloadError) as exc_info:
+        decode_job(b"{not json")
+
+    assert exc_info.value.invalid_json is True
+
+
+def test_decode_invalid_payload_is_classified():
+    with pytest.raises(InvalidJobPayloadError) as exc_info:
+        decode_job(b'{"job_id": "not-a-uuid"}')
+
+    assert exc_info.value.invalid_json is False
@@ -0,0 +1,92 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from notifications.common.config import Settings
+from notifications.worker.auth import AuthClient, UserContacts
+from notifications.worker.auth.contact_cache import ContactCache
+
+
+def _auth_client(handler, **overrides) -> AuthClient:
+    settings = Settings(auth_base_url="http://auth", **overrides)
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AuthClient(settings, http)
+
+
+@pytest.mark.asyncio
+async def test_contacts_and_not_found_users_are_cached():
+    known, unknown = uuid4(), uuid4()
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.endswith(str(known)):
+            return httpx.Response(200, json={"email": "known@example.com"})
+        return httpx.Response(404)
+
+    client = _auth_client(handler)
+    for _ in range(3):
+        assert (await client.get_user_contacts(known)).email == "known@example.com"
+        fake = await client.get_user_contacts(unknown)
+        assert fake.email == f"user-{unknown}@example.com"
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_not_cached():
+    user_id = uuid4()
+    responses = [httpx.Response(503), httpx.Response(200, json={"email": "a@b.c"})]
+
+    client = _auth_client(lambda request: responses.pop(0))
+
+    fallback = await client.get_user_contacts(user_id)
+    assert fallback.email == f"user-{user_id}@example.com"
+    assert (await client.get_user_contacts(user_id)).email == "a@b.c"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_lookup_and_stale_entries_refresh():
+    cache = ContactCache(
+        maxsize=10, ttl_seconds=0.0, negative_ttl_seconds=0.0, stale_seconds=60
+    )
+    user_id = uuid4()
+    loads = {"count": 0}
+
+    async def loader(uid):
+        loads["count"] += 1
+        await asyncio.sleep(0.01)
+        return UserContacts(user_id=uid, email=f"v{loads['count']}@example.com")
+
+    first = await asyncio.gather(*(cache.get(user_id, loader) for _ in range(5)))
+    assert loads["count"] == 1
+    assert {c.email for c in first} == {"v1@example.com"}
+
+    stale = await cache.get(user_id, loader)
+    assert stale.email == "v1@example.com"
+    await asyncio.sleep(0.02)
+    assert loads["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_lookup():
+    cache = ContactCache(maxsize=10, ttl_seconds=60, negative_ttl_seconds=0.0)
+    user_id = uuid4()
+    release = asyncio.Event()
+
+    async def loader(uid):
+        await release.wait()
+        return UserContacts(user_id=uid, email="a@example.com")
+
+    first = asyncio.create_task(cache.get(user_id, loader))
+    second = asyncio.create_task(cache.get(user_id, loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await second).email == "a@example.com"
+    assert first.cancelled()
+    assert len(cache) == 1
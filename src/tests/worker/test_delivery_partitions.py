@@ -0,0 +1,174 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import asyncpg
+import pytest
+
+from notifications.worker.repositories.delivery_partitions import (
+    _KEYS_DELETE_BATCH,
+    DeliveryPartitionManager,
+    expired_partitions,
+    future_partitions,
+    month_start,
+)
+
+
+class FakeConn:
+    def __init__(self, partitions: dict[str, list[str]]) -> None:
+        self.partitions = partitions
+        self.depth = 0
+        self.statements: list[tuple[str, tuple, int]] = []
+        self.delete_errors: list[Exception] = []
+        self.undroppable: set[str] = set()
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+
+    async def fetchval(self, query: str, *args):
+        self.statements.append((" ".join(query.split()), args, self.depth))
+        return True
+
+    async def fetch(self, query: str, parent: str):
+        return [{"relname": name} for name in self.partitions.get(parent, [])]
+
+    async def execute(self, query: str, *args) -> str:
+        query = " ".join(query.split())
+        self.statements.append((query, args, self.depth))
+        if query.startswith("DROP TABLE") and query.split('"')[1] in self.undroppable:
+            raise asyncpg.LockNotAvailableError("lock timeout")
+        if query.startswith("DELETE"):
+            if self.delete_errors:
+                raise self.delete_errors.pop(0)
+            return "DELETE 0"
+        return "OK"
+
+
+class FakePool:
+    def __init__(self, conn: FakeConn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+KEYS_DELETE = (
+    "DELETE FROM notification_delivery_keys WHERE job_id IN ( "
+    "SELECT job_id FROM notification_delivery_keys WHERE created_at < $1 LIMIT $2 )"
+)
+
+
+def test_month_start_wraps_years():
+    now = _utc(2026, 11, 17, 8, 30)
+    assert month_start(now) == _utc(2026, 11, 1)
+    assert month_start(now, 2) == _utc(2027, 1, 1)
+    assert month_start(now, -11) == _utc(2025, 12, 1)
+
+
+def test_future_partitions_cover_current_and_next_months():
+    partitions = future_partitions(_utc(2026, 12, 31, 23, 59), months_ahead=1)
+
+    assert partitions == [
+        ("notification_delivery_p202612", _utc(2026, 12, 1), _utc(2027, 1, 1)),
+        ("notification_delivery_p202701", _utc(2027, 1, 1), _utc(2027, 2, 1)),
+    ]
+
+
+def test_expired_partitions_respect_retention_and_skip_default():
+    names = [
+        "notification_delivery_default",
+        "notification_delivery_p202603",
+        "notification_delivery_p202604",
+        "notification_delivery_p202605",
+        "notification_delivery_p202610",
+    ]
+    now = _utc(2026, 10, 18)
+
+    assert expired_partitions(names, now, retention_months=5) == [
+        "notification_delivery_p202603",
+        "notification_delivery_p202604",
+    ]
+    assert expired_partitions(names, now, retention_months=0) == []
+
+
+@pytest.mark.asyncio
+async def test_maintenance_uses_transaction_lock_and_drops_expired_keys():
+    conn = FakeConn(
+        {
+            "notification_delivery": [
+                "notification_delivery_p202603",
+                "notification_delivery_p202610",
+                "notification_delivery_p202611",
+                "notification_delivery_p202612",
+            ]
+        }
+    )
+    manager = DeliveryPartitionManager(
+        FakePool(conn), months_ahead=2, retention_months=6
+    )
+
+    await manager.maintain(now=_utc(2026, 10, 18))
+
+    lock, _, depth = conn.statements[0]
+    assert "pg_try_advisory_xact_lock" in lock and depth == 1
+    assert not any("advisory_unlock" in sql for sql, _, _ in conn.statements)
+    assert ('DROP TABLE "notification_delivery_p202603"', (), 2) in conn.statements
+    assert conn.statements[-1] == (
+        KEYS_DELETE,
+        (_utc(2026, 4, 1), _KEYS_DELETE_BATCH),
+        0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_key_cleanup_is_retried_on_next_run():
+    conn = FakeConn({"notification_delivery": ["notification_delivery_p202610"]})
+    conn.delete_errors.append(ConnectionError("connection lost"))
+    manager = DeliveryPartitionManager(
+        FakePool(conn), months_ahead=0, retention_months=6
+    )
+
+    with pytest.raises(ConnectionError):
+        await manager.maintain(now=_utc(2026, 10, 18))
+    conn.statements.clear()
+    await manager.maintain(now=_utc(2026, 10, 18))
+
+    assert conn.statements[-1] == (
+        KEYS_DELETE,
+        (_utc(2026, 4, 1), _KEYS_DELETE_BATCH),
+        0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_keys_of_partition_that_failed_to_drop_are_kept():
+    conn = FakeConn(
+        {
+            "notification_delivery": [
+                "notification_delivery_p202602",
+                "notification_delivery_p202603",
+                "notification_delivery_p202610",
+            ]
+        }
+    )
+    conn.undroppable.add("notification_delivery_p202603")
+    manager = DeliveryPartitionManager(
+        FakePool(conn), months_ahead=0, retention_months=6
+    )
+
+    await manager.maintain(now=_utc(2026, 10, 18))
+
+    assert conn.statements[-1] == (
+        KEYS_DELETE,
+        (_utc(2026, 3, 1), _KEYS_DELETE_BATCH),
+        0,
+    )
@@ -0,0 +1,63 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from notifications.worker.repositories import (
+    DeliveryStatusRow,
+    NotificationDeliveryRepository,
+)
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.conn = MagicMock()
+        self.conn.executemany = AsyncMock()
+        self.conn.copy_records_to_table = AsyncMock()
+        self.conn.transaction = MagicMock(return_value=AsyncMock())
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _row(job_id, status: str, attempts: int, error: str | None = None):
+    return DeliveryStatusRow(
+        job_id=job_id,
+        user_id=uuid4(),
+        channel="email",
+        status=status,
+        attempts=attempts,
+        error_code=None,
+        error_message=error,
+        sent_at=None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_upserts_latest_status_and_logs_every_attempt():
+    retried, sent = uuid4(), uuid4()
+    rows = [
+        _row(retried, "RETRYING", 1, "smtp timeout"),
+        _row(sent, "SENT", 1),
+        _row(retried, "SENT", 2),
+    ]
+    pool = FakePool()
+
+    await NotificationDeliveryRepository(pool).save_status_many(rows)
+
+    _, upserts = pool.conn.executemany.await_args.args
+    assert [(args[0], args[3]) for args in upserts] == [
+        (retried, "SENT"),
+        (sent, "SENT"),
+    ]
+    copy = pool.conn.copy_records_to_table.await_args
+    assert copy.args == ("notification_attempts",)
+    assert [(r[0], r[2], r[3], r[5]) for r in copy.kwargs["records"]] == [
+        (retried, 1, "RETRYING", "smtp timeout"),
+        (sent, 1, "SENT", None),
+        (retried, 2, "SENT", None),
+    ]
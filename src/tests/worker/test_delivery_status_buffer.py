@@ -0,0 +1,120 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from notifications.worker.repositories import DeliveryStatusBuffer
+
+
+class RecordingRepo:
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: list[list] = []
+        self.fail = fail
+        self.writing = asyncio.Event()
+        self.release: asyncio.Event | None = None
+
+    async def get_by_job_id(self, job_id):
+        return None
+
+    async def save_status_many(self, rows) -> None:
+        self.writing.set()
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("db is down")
+        self.batches.append(list(rows))
+
+
+def _save(buffer: DeliveryStatusBuffer, job_id, status: str = "SENT"):
+    return buffer.save_status(
+        job_id=job_id,
+        user_id=uuid4(),
+        channel="email",
+        status=status,
+        attempts=1,
+        error_code=None,
+        error_message=None,
+        sent_at=None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_are_flushed_as_one_batch():
+    repo = RecordingRepo()
+    buffer = DeliveryStatusBuffer(repo, flush_interval_seconds=0.01, max_batch_size=100)
+    retried = uuid4()
+
+    await asyncio.gather(
+        _save(buffer, retried, "RETRYING"),
+        _save(buffer, retried, "SENT"),
+        *(_save(buffer, uuid4()) for _ in range(3)),
+    )
+
+    assert len(repo.batches) == 1
+    assert len(repo.batches[0]) == 5
+    latest = {row.job_id: row for row in repo.batches[0]}
+    assert latest[retried].status == "SENT"
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_interval():
+    repo = RecordingRepo()
+    buffer = DeliveryStatusBuffer(repo, flush_interval_seconds=60, max_batch_size=2)
+
+    await asyncio.wait_for(
+        asyncio.gather(_save(buffer, uuid4()), _save(buffer, uuid4())), 1
+    )
+
+    assert [len(batch) for batch in repo.batches] == [2]
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_is_raised_to_every_caller():
+    buffer = DeliveryStatusBuffer(
+        RecordingRepo(fail=True), flush_interval_seconds=0.01, max_batch_size=100
+    )
+
+    results = await asyncio.gather(
+        _save(buffer, uuid4()), _save(buffer, uuid4()), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_lone_writer_does_not_wait_for_interval():
+    repo = RecordingRepo()
+    buffer = DeliveryStatusBuffer(repo, flush_interval_seconds=60, max_batch_size=100)
+
+    started = time.monotonic()
+    for _ in range(20):
+        await _save(buffer, uuid4())
+
+    assert time.monotonic() - started < 0.5
+    assert [len(batch) for batch in repo.batches] == [1] * 20
+
+
+@pytest.mark.asyncio
+async def test_rows_queued_behind_a_write_follow_it_and_stay_visible():
+    repo = RecordingRepo()
+    repo.release = asyncio.Event()
+    buffer = DeliveryStatusBuffer(repo, flush_interval_seconds=60, max_batch_size=100)
+    first, second = uuid4(), uuid4()
+
+    saving = asyncio.create_task(_save(buffer, first))
+    await repo.writing.wait()
+    assert (await buffer.get_by_job_id(first)).status == "SENT"
+
+    queued = asyncio.create_task(_save(buffer, second))
+    await asyncio.sleep(0)
+    repo.release.set()
+    await asyncio.wait_for(asyncio.gather(saving, queued), 1)
+
+    assert [[row.job_id for row in batch] for batch in repo.batches] == [
+        [first],
+        [second],
+    ]
+    assert await buffer.get_by_job_id(first) is None
@@ -1,7 +1,14 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
 import pytest
 
 from notifications.worker.processor.job_processor import JobProcessor
-from tests.worker.conftest import FakeAuthClient
+from tests.worker.conftest import (
+    FakeAuthClient,
+    FakeDelayedDispatcher,
+    make_notification_job,
+)
 
 
 @pytest.mark.asyncio
@@ -44,3 +51,146 @@ async def test_job_processor_happy_email(
 
     dlq_publisher.publish_job.assert_not_awaited()
     dlq_publisher.publish_raw.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_job_processor_parks_future_send_after(
+    settings,
+    template_repo,
+    delivery_repo,
+    dlq_publisher,
+    email_sender,
+    push_sender,
+    ws_sender,
+    job_email,
+):
+    delayed_dispatcher = FakeDelayedDispatcher()
+    job_email.send_after = datetime.now(timezone.utc) + timedelta(hours=3)
+
+    processor = JobProcessor(
+        settings=settings,
+        template_repo=template_repo,
+        delivery_repo=delivery_repo,
+        auth_client=FakeAuthClient(email="user@example.com"),
+        email_sender=email_sender,
+        push_sender=push_sender,
+        ws_sender=ws_sender,
+        dlq_publisher=dlq_publisher,
+        delayed_dispatcher=delayed_dispatcher,
+    )
+
+    await processor.handle_job(job_email)
+
+    delayed_dispatcher.park.assert_awaited_once_with(job_email)
+    email_sender.send.assert_not_awaited()
+    delivery_repo.save_status.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_job_processor_prerenders_campaign_batch(
+    settings,
+    template_repo,
+    delivery_repo,
+    dlq_publisher,
+    email_sender,
+    push_sender,
+    ws_sender,
+):
+    campaign_id = uuid4()
+    jobs = [make_notification_job() for _ in range(3)]
+    for index, job in enumerate(jobs):
+        job.meta.campaign_id = campaign_id
+        job.data = {"name": f"User {index}"}
+
+    processor = JobProcessor(
+        settings=settings,
+        template_repo=template_repo,
+        delivery_repo=delivery_repo,
+        auth_client=FakeAuthClient(email="user@example.com"),
+        email_sender=email_sender,
+        push_sender=push_sender,
+        ws_sender=ws_sender,
+        dlq_publisher=dlq_publisher,
+    )
+
+    await processor.prepare_batch(jobs)
+    for job in jobs:
+        await processor.handle_job(job)
+
+    template_repo.get_template.assert_awaited_once()
+    bodies = [kwargs["body"] for _, kwargs in email_sender.send.await_args_list]
+    assert bodies == ["Welcome, User 0!", "Welcome, User 1!", "Welcome, User 2!"]
+
+
+@pytest.mark.asyncio
+async def test_job_processor_prefetches_campaign_contacts(
+    settings,
+    template_repo,
+    delivery_repo,
+    dlq_publisher,
+    email_sender,
+    push_sender,
+    ws_sender,
+):
+    campaign_id = uuid4()
+    jobs = [make_notification_job() for _ in range(3)]
+    for job in jobs:
+        job.meta.campaign_id = campaign_id
+    auth_client = FakeAuthClient(email="user@example.com")
+
+    processor = JobProcessor(
+        settings=settings,
+        template_repo=template_repo,
+        delivery_repo=delivery_repo,
+        auth_client=auth_client,
+        email_sender=email_sender,
+        push_sender=push_sender,
+        ws_sender=ws_sender,
+        dlq_publisher=dlq_publisher,
+    )
+
+    await processor.prepare_batch(jobs)
+    for job in jobs:
+        await processor.handle_job(job)
+
+    auth_client.get_many_user_contacts.assert_awaited_once_with(
+        [job.user_id for job in jobs]
+    )
+    auth_client.get_user_contacts.assert_not_awaited()
+    contacts = [kwargs["contacts"] for _, kwargs in email_sender.send.await_args_list]
+    assert [c.user_id for c in contacts] == [job.user_id for job in jobs]
+
+
+@pytest.mark.asyncio
+async def test_job_processor_skips_redelivered_finished_job_without_db(
+    settings,
+    template_repo,
+    delivery_repo,
+    dlq_publisher,
+    email_sender,
+    push_sender,
+    ws_sender,
+    job_email,
+):
+    processor = JobProcessor(
+        settings=settings,
+        template_repo=template_repo,
+        delivery_repo=delivery_repo,
+        auth_client=FakeAuthClient(email="user@example.com"),
+        email_sender=email_sender,
+        push_sender=push_sender,
+        ws_sender=ws_sender,
+        dlq_publisher=dlq_publisher,
+    )
+
+    await processor.handle_job(job_email)
+    await processor.handle_job(job_email)
+
+    delivery_repo.claim.assert_awaited_once_with(
+        job_id=job_email.job_id,
+        user_id=job_email.user_id,
+        channel="email",
+        created_at=job_email.created_at,
+    )
+    delivery_repo.get_by_job_id.assert_not_awaited()
+    email_sender.send.assert_awaited_once()
@@ -0,0 +1,438 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from aiokafka.structs import TopicPartition
+
+from notifications.common.codec import encode_json
+from notifications.common.config import Settings
+from notifications.worker.consumer import kafka_consumer
+from notifications.worker.consumer.kafka_consumer import KafkaNotificationConsumer
+from notifications.worker.retry.publisher import (
+    RETRY_ATTEMPTS_HEADER,
+    RETRY_DUE_AT_HEADER,
+)
+from tests.worker.conftest import make_notification_job
+
+TOPIC = "notifications.outbox"
+PRIORITY_TOPIC = "notifications.outbox.high"
+
+
+class FakeKafkaConsumer:
+    def __init__(self) -> None:
+        self.commits: list[dict] = []
+        self.seeks: list[tuple] = []
+        self.paused: set = set()
+        self.assigned: set = {TopicPartition(TOPIC, 0)}
+        self.pending: dict = {}
+
+    async def commit(self, offsets) -> None:
+        self.commits.append(dict(offsets))
+
+    def seek(self, tp, offset) -> None:
+        self.seeks.append((tp, offset))
+
+    def pause(self, *tps) -> None:
+        self.paused.update(tps)
+
+    def resume(self, *tps) -> None:
+        self.paused.difference_update(tps)
+
+    def assignment(self) -> set:
+        return self.paused | self.assigned
+
+    def subscribe(self, topics, listener=None) -> None:
+        pass
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def getmany(self, *tps, timeout_ms=0, max_records=None) -> dict:
+        wanted = tps or list(self.pending)
+        if not any(tp in self.pending for tp in wanted):
+            await asyncio.sleep(timeout_ms / 1000)
+        return {tp: self.pending.pop(tp) for tp in wanted if tp in self.pending}
+
+
+def _record(
+    partition: int,
+    offset: int,
+    value: bytes = b"{}",
+    topic: str = TOPIC,
+    headers: tuple = (),
+):
+    return SimpleNamespace(
+        topic=topic, partition=partition, offset=offset, value=value, headers=headers
+    )
+
+
+def _make_consumer(**overrides) -> KafkaNotificationConsumer:
+    consumer = KafkaNotificationConsumer(
+        settings=Settings(**overrides), processor=None, dlq_publisher=None
+    )
+    consumer._consumer = FakeKafkaConsumer()
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_batch_is_committed_once_up_to_contiguous_offsets():
+    consumer = _make_consumer(
+        consumer_batch_enabled=True,
+        consumer_max_in_flight=10,
+        consumer_max_in_flight_per_partition=5,
+    )
+    release = asyncio.Event()
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        if raw_value == b"slow":
+            await release.wait()
+
+    consumer._handle_message = handle
+    tp0, tp1 = TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)
+    consumer._consumer.assigned.add(tp1)
+
+    await consumer._dispatch_batch(
+        {
+            tp0: [_record(0, 0), _record(0, 1, b"slow"), _record(0, 2)],
+            tp1: [_record(1, 0), _record(1, 1)],
+        }
+    )
+    await asyncio.sleep(0)
+    await consumer._commit()
+
+    assert consumer._consumer.commits == [{tp0: 1, tp1: 2}]
+
+    release.set()
+    await asyncio.sleep(0)
+    await consumer._commit()
+
+    assert consumer._consumer.commits[-1] == {tp0: 3}
+    assert len(consumer._consumer.commits) == 2
+
+
+@pytest.mark.asyncio
+async def test_per_partition_limit_bounds_in_flight_jobs():
+    consumer = _make_consumer(
+        consumer_max_in_flight=10, consumer_max_in_flight_per_partition=2
+    )
+    active = {"now": 0, "max": 0}
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+
+    await consumer._dispatch_batch({tp: [_record(0, i) for i in range(6)]})
+    await asyncio.gather(*list(consumer._tasks))
+
+    assert active["max"] == 2
+    assert consumer._tracker.commit_points() == {tp: 6}
+
+
+@pytest.mark.asyncio
+async def test_retry_record_not_yet_due_pauses_partition():
+    consumer = _make_consumer(
+        kafka_retry_topics_enabled=True, consumer_max_in_flight=10
+    )
+    handled: list[int] = []
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        handled.append(previous_attempts)
+
+    consumer._handle_message = handle
+    retry_topic = "notifications.retry.3s"
+    tp = TopicPartition(retry_topic, 0)
+    consumer._consumer.assigned.add(tp)
+    now_ms = int(time.time() * 1000)
+
+    def retry_record(offset: int, due_at_ms: int):
+        headers = (
+            (RETRY_ATTEMPTS_HEADER, b"1"),
+            (RETRY_DUE_AT_HEADER, str(due_at_ms).encode()),
+        )
+        return _record(0, offset, topic=retry_topic, headers=headers)
+
+    await consumer._dispatch_batch(
+        {
+            tp: [
+                retry_record(0, now_ms - 1000),
+                retry_record(1, now_ms + 60_000),
+                retry_record(2, now_ms + 60_000),
+            ]
+        }
+    )
+    await asyncio.gather(*list(consumer._tasks))
+
+    assert handled == [1]
+    assert consumer._consumer.seeks == [(tp, 1)]
+    assert tp in consumer._consumer.paused
+    assert consumer._tracker.commit_points() == {tp: 1}
+
+    consumer._resume_deferred(tp)
+    assert tp not in consumer._consumer.paused
+
+
+@pytest.mark.asyncio
+async def test_revoked_partition_is_neither_dispatched_nor_committed():
+    consumer = _make_consumer(
+        consumer_max_in_flight=1, consumer_max_in_flight_per_partition=5
+    )
+    release = asyncio.Event()
+    handled: list[tuple[int, int]] = []
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        handled.append(tuple(raw_value))
+        await release.wait()
+
+    consumer._handle_message = handle
+    tp0, tp1 = TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)
+    consumer._consumer.assigned.add(tp1)
+
+    dispatch = asyncio.create_task(
+        consumer._dispatch_batch(
+            {
+                tp0: [_record(0, 0, bytes((0, 0))), _record(0, 1, bytes((0, 1)))],
+                tp1: [_record(1, 0, bytes((1, 0)))],
+            }
+        )
+    )
+    await asyncio.sleep(0)
+    # tp1 is revoked while its record waits for the saturated lane.
+    consumer._consumer.assigned.discard(tp1)
+    release.set()
+    await dispatch
+    await asyncio.gather(*list(consumer._tasks))
+    await consumer._commit()
+
+    assert (1, 0) not in handled
+    assert consumer._consumer.commits == [{tp0: 2}]
+
+
+class FakePrerenderingProcessor:
+    def __init__(self) -> None:
+        self.prerendered: dict = {}
+
+    async def prepare_batch(self, jobs) -> None:
+        for job in jobs:
+            self.prerendered[job.job_id] = ("subject", "body")
+
+    def discard_prerendered(self, job_ids) -> None:
+        for job_id in job_ids:
+            self.prerendered.pop(job_id, None)
+
+
+@pytest.mark.asyncio
+async def test_prerendered_bodies_of_revoked_records_are_discarded():
+    consumer = _make_consumer(
+        consumer_batch_enabled=True,
+        consumer_max_in_flight=1,
+        consumer_max_in_flight_per_partition=5,
+    )
+    processor = FakePrerenderingProcessor()
+    consumer._processor = processor
+    release = asyncio.Event()
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        processor.prerendered.pop(job.job_id, None)
+        await release.wait()
+
+    consumer._handle_message = handle
+    tp0, tp1 = TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)
+    consumer._consumer.assigned.add(tp1)
+
+    def job_record(partition: int, offset: int):
+        value = encode_json(make_notification_job())
+        return _record(partition, offset, value)
+
+    dispatch = asyncio.create_task(
+        consumer._dispatch_batch(
+            {
+                tp0: [job_record(0, 0), job_record(0, 1)],
+                tp1: [job_record(1, 0), job_record(1, 1)],
+            }
+        )
+    )
+    await asyncio.sleep(0)
+    assert processor.prerendered
+    # tp1 is revoked while its records wait for the saturated lane.
+    consumer._consumer.assigned.discard(tp1)
+    release.set()
+    await dispatch
+    await asyncio.gather(*list(consumer._tasks))
+
+    assert processor.prerendered == {}
+
+
+@pytest.mark.asyncio
+async def test_priority_records_bypass_saturated_normal_lane():
+    consumer = _make_consumer(
+        priority_lanes_enabled=True,
+        consumer_max_in_flight=1,
+        consumer_max_in_flight_per_partition=5,
+        consumer_batch_max_wait_ms=1,
+    )
+    release = asyncio.Event()
+    handled: list[bytes] = []
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        handled.append(raw_value)
+        if raw_value == b"campaign":
+            await release.wait()
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+    priority_tp = TopicPartition(PRIORITY_TOPIC, 0)
+    consumer._consumer.assigned.add(priority_tp)
+    consumer._consumer.pending[priority_tp] = [
+        _record(0, 0, b"reset", topic=PRIORITY_TOPIC)
+    ]
+
+    dispatch = asyncio.create_task(
+        consumer._dispatch_batch(
+            {tp: [_record(0, 0, b"campaign"), _record(0, 1, b"campaign")]}
+        )
+    )
+    await asyncio.sleep(0.01)
+
+    assert handled == [b"campaign", b"reset"]
+    assert consumer._tracker.commit_points() == {priority_tp: 1}
+
+    release.set()
+    await dispatch
+    await asyncio.gather(*list(consumer._tasks))
+    assert handled[-1] == b"campaign"
+
+
+@pytest.mark.asyncio
+async def test_idle_priority_topic_does_not_delay_normal_lane():
+    consumer = _make_consumer(
+        priority_lanes_enabled=True,
+        consumer_max_in_flight=1,
+        consumer_max_in_flight_per_partition=20,
+        consumer_batch_max_wait_ms=100,
+    )
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        await asyncio.sleep(0.002)
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+    consumer._consumer.assigned.add(TopicPartition(PRIORITY_TOPIC, 0))
+
+    started = time.monotonic()
+    await consumer._dispatch_batch({tp: [_record(0, i) for i in range(20)]})
+    await asyncio.gather(*list(consumer._tasks))
+
+    assert time.monotonic() - started < 0.5
+    assert consumer._tracker.commit_points() == {tp: 20}
+
+
+@pytest.mark.asyncio
+async def test_backpressure_pauses_above_high_and_resumes_below_low_watermark():
+    consumer = _make_consumer(
+        consumer_max_in_flight=10,
+        consumer_max_in_flight_per_partition=10,
+        consumer_pause_high_watermark=3,
+        consumer_pause_low_watermark=1,
+    )
+    releases = [asyncio.Event() for _ in range(3)]
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        await releases[int(raw_value)].wait()
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+
+    await consumer._dispatch_batch({tp: [_record(0, i, b"%d" % i) for i in range(3)]})
+    assert tp in consumer._consumer.paused
+
+    releases[0].set()
+    await asyncio.sleep(0)
+    assert tp in consumer._consumer.paused
+
+    releases[1].set()
+    await asyncio.sleep(0)
+    assert tp not in consumer._consumer.paused
+    assert consumer._backpressure_since is None
+
+    releases[2].set()
+    await asyncio.gather(*list(consumer._tasks))
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_jobs_before_final_commit():
+    consumer = _make_consumer(consumer_max_in_flight=10)
+    release = asyncio.Event()
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        await release.wait()
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+    await consumer._dispatch_batch({tp: [_record(0, 0)]})
+
+    consumer._drain_deadline = time.monotonic() + 1.0
+    drain = asyncio.create_task(consumer._drain_in_flight())
+    await asyncio.sleep(0)
+    assert not drain.done()
+
+    release.set()
+    await drain
+    await consumer._commit()
+    assert consumer._consumer.commits == [{tp: 1}]
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_deadline():
+    consumer = _make_consumer(consumer_max_in_flight=10)
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        await asyncio.Event().wait()
+
+    consumer._handle_message = handle
+    tp = TopicPartition(TOPIC, 0)
+    await consumer._dispatch_batch({tp: [_record(0, 0)]})
+
+    consumer._drain_deadline = time.monotonic() + 0.01
+    await consumer._drain_in_flight()
+    await consumer._cancel_in_flight()
+    await consumer._commit()
+    assert consumer._consumer.commits == []
+
+
+@pytest.mark.asyncio
+async def test_drain_deadline_covers_jobs_waiting_for_a_slot(monkeypatch):
+    consumer = _make_consumer(
+        consumer_max_in_flight=1,
+        consumer_max_in_flight_per_partition=5,
+        consumer_batch_max_wait_ms=10,
+    )
+    fake = consumer._consumer
+    monkeypatch.setattr(kafka_consumer, "AIOKafkaConsumer", lambda **kwargs: fake)
+    tp = TopicPartition(TOPIC, 0)
+    fake.pending[tp] = [_record(0, 0, b"a"), _record(0, 1, b"b")]
+    started: list[bytes] = []
+
+    async def handle(raw_value: bytes, previous_attempts: int = 0, job=None) -> None:
+        started.append(raw_value)
+        await asyncio.sleep(1.0)
+
+    consumer._handle_message = handle
+    run = asyncio.create_task(consumer.start())
+    await asyncio.sleep(0.05)
+
+    began = time.monotonic()
+    await consumer.drain(0.1)
+    await run
+
+    assert time.monotonic() - began < 0.5
+    assert started == [b"a"]
+    assert fake.commits == []
@@ -0,0 +1,45 @@
+from aiokafka.structs import TopicPartition
+
+from notifications.worker.consumer.offsets import OffsetTracker
+
+TP = TopicPartition("notifications.outbox", 0)
+
+
+def test_commit_point_waits_for_lowest_in_flight_offset():
+    tracker = OffsetTracker()
+    for offset in (10, 11, 12):
+        tracker.start(TP, offset)
+
+    tracker.complete(TP, 11)
+    tracker.complete(TP, 12)
+    assert tracker.commit_points() == {}
+
+    tracker.complete(TP, 10)
+    assert tracker.commit_points() == {TP: 13}
+
+
+def test_commit_point_not_repeated_after_mark_committed():
+    tracker = OffsetTracker()
+    tracker.start(TP, 5)
+    tracker.complete(TP, 5)
+
+    points = tracker.commit_points()
+    assert points == {TP: 6}
+
+    tracker.mark_committed(points)
+    assert tracker.commit_points() == {}
+
+
+def test_in_flight_counts_and_forget():
+    other = TopicPartition("notifications.outbox", 1)
+    tracker = OffsetTracker()
+    tracker.start(TP, 1)
+    tracker.start(TP, 2)
+    tracker.start(other, 7)
+
+    assert tracker.in_flight(TP) == 2
+    assert tracker.in_flight() == 3
+
+    tracker.forget([TP])
+    assert tracker.in_flight() == 1
+    assert TP not in tracker.commit_points()
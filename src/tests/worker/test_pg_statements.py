@@ -0,0 +1,40 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from notifications.common.pg import StatementRegistry
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.fetchrow = AsyncMock(return_value={"raw": True})
+        self.prepare = AsyncMock(side_effect=self._prepare)
+
+    async def _prepare(self, sql: str):
+        stmt = AsyncMock()
+        stmt.fetchrow = AsyncMock(return_value={"prepared": sql})
+        return stmt
+
+
+@pytest.mark.asyncio
+async def test_registered_statements_use_prepared_copy_when_available():
+    registry = StatementRegistry()
+    name = registry.register("users.get", "SELECT $1::int")
+
+    conn = FakeConnection()
+    assert await registry.fetchrow(conn, name, 1) == {"raw": True}
+    conn.fetchrow.assert_awaited_once_with("SELECT $1::int", 1)
+
+    await registry.prepare_all(conn)
+    assert await registry.fetchrow(conn, name, 1) == {"prepared": "SELECT $1::int"}
+    conn.prepare.assert_awaited_once_with("SELECT $1::int")
+    assert conn.fetchrow.await_count == 1
+
+
+def test_conflicting_registration_is_rejected():
+    registry = StatementRegistry()
+    registry.register("users.get", "SELECT 1")
+    registry.register("users.get", "SELECT 1")
+
+    with pytest.raises(ValueError):
+        registry.register("users.get", "SELECT 2")
@@ -0,0 +1,80 @@
+import pickle
+import time
+
+import pytest
+
+from notifications.common.config import Settings
+from notifications.common.exceptions import TemplateRenderLimitError
+from notifications.worker.core.render_executor import RenderExecutor
+
+HUGE_LOOP = (
+    "{% for i in range(100000) %}{% for j in range(100000) %}x{% endfor %}{% endfor %}"
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["none", "thread"])
+async def test_render_stops_at_output_size_limit(mode):
+    executor = RenderExecutor(
+        Settings(render_executor=mode, render_max_output_size=1000)
+    )
+    try:
+        assert await executor.render("Hi {{ name }}", {"name": "Ann"}) == "Hi Ann"
+        with pytest.raises(TemplateRenderLimitError) as exc_info:
+            await executor.render(HUGE_LOOP, {})
+    finally:
+        executor.shutdown()
+
+    assert exc_info.value.limit == "output_size"
+    assert exc_info.value.retryable is False
+
+
+@pytest.mark.asyncio
+async def test_render_stops_at_cpu_time_limit():
+    executor = RenderExecutor(Settings(render_timeout_seconds=0.05))
+
+    with pytest.raises(TemplateRenderLimitError) as exc_info:
+        await executor.render(HUGE_LOOP, {})
+
+    assert exc_info.value.limit == "cpu_time"
+
+
+SILENT_LOOP = (
+    "{% for i in range(3000) %}{% for j in range(1000) %}{% endfor %}{% endfor %}"
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["thread", "process"])
+async def test_silent_loop_hits_wall_clock_limit(mode):
+    executor = RenderExecutor(
+        Settings(
+            render_executor=mode,
+            render_executor_workers=1,
+            render_timeout_seconds=0.05,
+            render_timeout_grace_seconds=0.05,
+        )
+    )
+    try:
+        assert await executor.render("Hi", {}) == "Hi"
+
+        started = time.monotonic()
+        with pytest.raises(TemplateRenderLimitError) as exc_info:
+            await executor.render(SILENT_LOOP, {})
+        assert time.monotonic() - started < 0.4
+        assert exc_info.value.limit == "wall_time"
+
+        if mode == "process":
+            assert await executor.render("Hi {{ name }}", {"name": "Ann"}) == "Hi Ann"
+    finally:
+        executor.shutdown()
+
+
+def test_limit_error_survives_process_boundary():
+    error = pickle.loads(pickle.dumps(TemplateRenderLimitError("cpu_time", 0.5)))
+    assert (error.limit, error.value) == ("cpu_time", 0.5)
+
+
+def test_unknown_executor_mode_is_rejected():
+    with pytest.raises(ValueError):
+        RenderExecutor(Settings(render_executor="gpu"))
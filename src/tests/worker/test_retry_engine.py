@@ -1,9 +1,16 @@
+import asyncio
+
 import pytest
 
+from notifications.common.exceptions import (
+    ChannelBulkheadFullError,
+    TemplateRenderLimitError,
+)
 from notifications.worker.processor.retry_engine import attempt_with_retries
 from tests.worker.conftest import (
     FakeDeliveryRepo,
     FakeDlqPublisher,
+    FakeRetryPublisher,
     make_notification_job,
 )
 
@@ -63,3 +70,145 @@ async def test_retry_engine_exhausts_attempts_and_goes_to_dlq():
 
     assert delivery_repo.save_status.await_count >= 2
     dlq_publisher.publish_job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_retry_engine_republishes_instead_of_sleeping():
+    job = make_notification_job()
+    delivery_repo = FakeDeliveryRepo()
+    dlq_publisher = FakeDlqPublisher()
+    retry_publisher = FakeRetryPublisher()
+
+    async def attempt_send_fn(j):
+        raise RuntimeError("provider down")
+
+    await attempt_with_retries(
+        job=job,
+        existing_attempts=0,
+        max_attempts=3,
+        retry_delays=[60.0, 60.0],
+        attempt_send_fn=attempt_send_fn,
+        delivery_repo=delivery_repo,
+        dlq_publisher=dlq_publisher,
+        retry_publisher=retry_publisher,
+    )
+
+    retry_publisher.publish_retry.assert_awaited_once_with(
+        job, attempts=1, delay=60.0, error_message="provider down"
+    )
+    assert delivery_repo.save_status.await_args.kwargs["status"] == "RETRYING"
+    dlq_publisher.publish_job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_retry_engine_does_not_retry_non_retryable_errors():
+    job = make_notification_job()
+    delivery_repo = FakeDeliveryRepo()
+    dlq_publisher = FakeDlqPublisher()
+    retry_publisher = FakeRetryPublisher()
+
+    async def attempt_send_fn(j):
+        raise TemplateRenderLimitError("cpu_time", 0.5)
+
+    await attempt_with_retries(
+        job=job,
+        existing_attempts=0,
+        max_attempts=3,
+        retry_delays=[1.0, 3.0],
+        attempt_send_fn=attempt_send_fn,
+        delivery_repo=delivery_repo,
+        dlq_publisher=dlq_publisher,
+        retry_publisher=retry_publisher,
+    )
+
+    assert delivery_repo.save_status.await_args.kwargs["status"] == "FAILED"
+    retry_publisher.publish_retry.assert_not_awaited()
+    dlq_publisher.publish_job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_saturated_channel_does_not_spend_attempts():
+    job = make_notification_job()
+    delivery_repo = FakeDeliveryRepo()
+    dlq_publisher = FakeDlqPublisher()
+    state = {"rejected": 0}
+
+    async def attempt_send_fn(j):
+        if state["rejected"] < 3:
+            state["rejected"] += 1
+            raise ChannelBulkheadFullError("email", 1)
+
+    await attempt_with_retries(
+        job=job,
+        existing_attempts=0,
+        max_attempts=3,
+        retry_delays=[0.0],
+        attempt_send_fn=attempt_send_fn,
+        delivery_repo=delivery_repo,
+        dlq_publisher=dlq_publisher,
+    )
+
+    delivery_repo.save_status.assert_awaited_once()
+    assert delivery_repo.save_status.await_args.kwargs["status"] == "SENT"
+    assert delivery_repo.save_status.await_args.kwargs["attempts"] == 1
+    dlq_publisher.publish_job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_saturated_channel_defers_via_retry_topic_without_failing():
+    job = make_notification_job()
+    delivery_repo = FakeDeliveryRepo()
+    dlq_publisher = FakeDlqPublisher()
+    retry_publisher = FakeRetryPublisher()
+
+    async def attempt_send_fn(j):
+        raise ChannelBulkheadFullError("email", 1)
+
+    await attempt_with_retries(
+        job=job,
+        existing_attempts=2,
+        max_attempts=3,
+        retry_delays=[1.0, 3.0, 10.0],
+        attempt_send_fn=attempt_send_fn,
+        delivery_repo=delivery_repo,
+        dlq_publisher=dlq_publisher,
+        retry_publisher=retry_publisher,
+    )
+
+    retry_publisher.publish_retry.assert_awaited_once_with(
+        job,
+        attempts=2,
+        delay=10.0,
+        error_message=str(ChannelBulkheadFullError("email", 1)),
+    )
+    delivery_repo.save_status.assert_not_awaited()
+    dlq_publisher.publish_job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_persistently_saturated_channel_gives_up_without_retry_topic():
+    job = make_notification_job()
+    delivery_repo = FakeDeliveryRepo()
+    dlq_publisher = FakeDlqPublisher()
+    calls = {"count": 0}
+
+    async def attempt_send_fn(j):
+        calls["count"] += 1
+        raise ChannelBulkheadFullError("email", 1)
+
+    await asyncio.wait_for(
+        attempt_with_retries(
+            job=job,
+            existing_attempts=0,
+            max_attempts=3,
+            retry_delays=[0.0],
+            attempt_send_fn=attempt_send_fn,
+            delivery_repo=delivery_repo,
+            dlq_publisher=dlq_publisher,
+        ),
+        1,
+    )
+
+    assert calls["count"] == 6
+    assert delivery_repo.save_status.await_args.kwargs["status"] == "FAILED"
+    dlq_publisher.publish_job.assert_awaited_once()
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from notifications.common import health_files
+from notifications.common.config import Settings
+from notifications.worker import supervisor
+from notifications.worker.supervisor import WorkerSupervisor, aggregate_health
+
+
+@pytest.fixture
+def health_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(health_files, "READY_PATH", tmp_path / "ready")
+    monkeypatch.setattr(health_files, "HEARTBEAT_PATH", tmp_path / "heartbeat")
+    return tmp_path
+
+
+def test_aggregate_health_requires_every_child_ready(health_dir):
+    (health_dir / "ready.w0").write_text("ok\n")
+    (health_dir / "heartbeat.w0").write_text("100.0")
+    (health_dir / "heartbeat.w1").write_text("90.0")
+
+    ready, heartbeat = aggregate_health(["w0", "w1"])
+    assert ready is False
+    assert heartbeat == 90.0
+
+    (health_dir / "ready.w1").write_text("ok\n")
+    ready, _ = aggregate_health(["w0", "w1"])
+    assert ready is True
+
+
+def test_aggregate_health_without_child_heartbeat(health_dir):
+    (health_dir / "ready.w0").write_text("ok\n")
+    (health_dir / "heartbeat.w0").write_text("100.0")
+
+    (health_dir / "ready.w1").write_text("ok\n")
+
+    ready, heartbeat = aggregate_health(["w0", "w1"])
+    assert ready is False
+    assert heartbeat is None
+
+
+def test_write_heartbeat_replaces_file(health_dir):
+    health_files.write_heartbeat(123.0)
+
+    assert health_files.read_heartbeat(health_dir / "heartbeat") == 123.0
+    assert [p.name for p in health_dir.iterdir()] == ["heartbeat"]
+
+
+def test_crashing_child_is_restarted_with_backoff(monkeypatch):
+    clock = {"now": 0.0}
+    monkeypatch.setattr(supervisor.time, "monotonic", lambda: clock["now"])
+    sup = WorkerSupervisor(
+        Settings(
+            worker_restart_backoff_seconds=1.0,
+            worker_restart_backoff_max_seconds=4.0,
+        ),
+        processes=1,
+        child_target=lambda instance: None,
+    )
+    spawned: list[float] = []
+
+    def spawn(instance: str) -> None:
+        spawned.append(clock["now"])
+        sup._children[instance] = SimpleNamespace(
+            pid=1, exitcode=1, is_alive=lambda: False, close=lambda: None
+        )
+        sup._started_at[instance] = clock["now"]
+
+    monkeypatch.setattr(sup, "_spawn", spawn)
+    spawn("w0")
+
+    for _ in range(80):
+        clock["now"] += 0.25
+        sup._restart_exited()
+
+    assert spawned[:5] == [0.0, 1.25, 3.5, 7.75, 12.0]
+    assert spawned[5] - spawned[4] == 4.25
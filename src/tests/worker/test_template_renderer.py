@@ -0,0 +1,98 @@
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    StrictUndefined,
+    UndefinedError,
+)
+
+from notifications.worker.core import template_renderer
+from notifications.worker.core.template_renderer import (
+    CompiledTemplateCache,
+    DatabaseLoader,
+    env,
+    render_html_template,
+    render_html_template_batch,
+)
+
+
+def test_compiled_templates_are_reused_and_evicted_lru():
+    cache = CompiledTemplateCache(env, maxsize=2)
+
+    first = cache.get("Hello, {{ name }}!")
+    assert cache.get("Hello, {{ name }}!") is first
+
+    cache.get("Bye, {{ name }}!")
+    cache.get("Hello, {{ name }}!")
+    cache.get("Welcome, {{ name }}!")
+
+    assert len(cache) == 2
+    assert cache.get("Hello, {{ name }}!") is first
+    assert first.render(name="<b>") == "Hello, &lt;b&gt;!"
+
+
+def test_zero_size_cache_compiles_every_time():
+    cache = CompiledTemplateCache(env, maxsize=0)
+
+    assert cache.get("{{ x }}") is not cache.get("{{ x }}")
+    assert len(cache) == 0
+
+
+def test_batch_render_matches_single_renders_and_memoizes_shared_blocks(monkeypatch):
+    source = "{% block banner %}{{ campaign | upper }}{% endblock %} Hello, {{ name }}!"
+    contexts = [{"campaign": "sale", "name": n} for n in ("Ann", "<Bob>")]
+
+    calls = {"upper": 0}
+    original = env.filters["upper"]
+
+    def counting_upper(value):
+        calls["upper"] += 1
+        return original(value)
+
+    monkeypatch.setitem(env.filters, "upper", counting_upper)
+    template_renderer.template_cache.clear()
+
+    rendered = render_html_template_batch(source, contexts)
+
+    assert calls["upper"] == 1
+    assert rendered == [render_html_template(source, ctx) for ctx in contexts]
+    assert rendered[1] == "SALE Hello, &lt;Bob&gt;!"
+
+
+def test_batch_render_can_return_per_context_errors(monkeypatch):
+    monkeypatch.setattr(env, "undefined", StrictUndefined)
+    template_renderer.template_cache.clear()
+
+    results = render_html_template_batch(
+        "Hi {{ name }}", [{"name": "Ann"}, {}], return_exceptions=True
+    )
+    template_renderer.template_cache.clear()
+
+    assert results[0] == "Hi Ann"
+    assert isinstance(results[1], UndefinedError)
+
+
+def test_bytecode_cache_is_reused_by_a_fresh_process(tmp_path):
+    def cold_cache() -> CompiledTemplateCache:
+        environment = Environment(bytecode_cache=FileSystemBytecodeCache(tmp_path))
+        return CompiledTemplateCache(environment, maxsize=10)
+
+    cold_cache().get("Hello, {{ name }}!")
+    assert len(list(tmp_path.iterdir())) == 1
+
+    restarted = cold_cache()
+    restarted._env.compile = None
+    assert restarted.get("Hello, {{ name }}!").render(name="Ann") == "Hello, Ann!"
+
+
+def test_database_loader_resolves_includes():
+    loader = DatabaseLoader()
+    environment = Environment(loader=loader)
+    loader.put("footer/ru/email", "Bye, {{ name }}")
+
+    template = CompiledTemplateCache(environment, maxsize=10).get(
+        'Hi. {% include "footer/ru/email" %}'
+    )
+    assert template.render(name="Ann") == "Hi. Bye, Ann"
+
+    loader.put("footer/ru/email", "See you, {{ name }}")
+    assert template.render(name="Ann") == "Hi. See you, Ann"
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from notifications.worker.repositories import TemplateRepository
+
+
+class FakePool:
+    def __init__(self, rows: dict) -> None:
+        self.conn = AsyncMock()
+        self.conn.fetchrow = AsyncMock(side_effect=lambda _q, *key: rows.get(key))
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+ROW = {
+    "template_code": "welcome_email",
+    "locale": "ru",
+    "channel": "email",
+    "subject": "Hi",
+    "body": "Hello",
+}
+
+
+@pytest.mark.asyncio
+async def test_templates_and_misses_are_cached_until_notified():
+    pool = FakePool({("welcome_email", "ru", "email"): ROW})
+    repo = TemplateRepository(pool, cache_ttl_seconds=60, negative_ttl_seconds=60)
+
+    for _ in range(3):
+        template = await repo.get_template("welcome_email", "ru", "email")
+        assert await repo.get_template("missing", "ru", "email") is None
+
+    assert template.body == "Hello"
+    assert pool.conn.fetchrow.await_count == 2
+
+    repo._on_notification(
+        None,
+        0,
+        "template_changes",
+        json.dumps(
+            {"template_code": "welcome_email", "locale": "ru", "channel": "email"}
+        ),
+    )
+    await repo.get_template("welcome_email", "ru", "email")
+    await repo.get_template("missing", "ru", "email")
+
+    assert pool.conn.fetchrow.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_by_default():
+    pool = FakePool({("welcome_email", "ru", "email"): ROW})
+    repo = TemplateRepository(pool)
+
+    await repo.get_template("welcome_email", "ru", "email")
+    await repo.get_template("welcome_email", "ru", "email")
+
+    assert pool.conn.fetchrow.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_preload_fills_cache():
+    pool = FakePool({})
+    pool.conn.fetch = AsyncMock(return_value=[ROW])
+    repo = TemplateRepository(pool, cache_ttl_seconds=60)
+
+    templates = await repo.preload(limit=10)
+    template = await repo.get_template("welcome_email", "ru", "email")
+
+    assert templates == [template]
+    pool.conn.fetch.assert_awaited_once()
+    assert pool.conn.fetch.await_args.args[1] == 10
+    pool.conn.fetchrow.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fetch_racing_an_invalidation_is_not_cached():
+    pool = FakePool({})
+    fetched = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fetchrow(_query, *args):
+        fetched.set()
+        await release.wait()
+        return ROW
+
+    async def fetch(query, *args):
+        return [await fetchrow(query)]
+
+    pool.conn.fetchrow = AsyncMock(side_effect=fetchrow)
+    pool.conn.fetch = AsyncMock(side_effect=fetch)
+    repo = TemplateRepository(pool, cache_ttl_seconds=60)
+
+    get = asyncio.create_task(repo.get_template("welcome_email", "ru", "email"))
+    preload = asyncio.create_task(repo.preload(limit=10))
+    await fetched.wait()
+    repo.invalidate("welcome_email", "ru", "email")
+    release.set()
+    await asyncio.gather(get, preload)
+
+    assert repo._cache == {}